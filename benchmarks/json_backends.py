@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+"""Compare the JSON backends of labelme.utils on label files.
+
+    python benchmarks/json_backends.py data_annotated/
+"""
+
+import argparse
+import glob
+import io
+import os.path as osp
+import time
+
+from labelme import utils
+from labelme.utils._json import JSON_BACKENDS
+
+
+here = osp.dirname(osp.abspath(__file__))
+
+
+def iter_json_files(paths):
+    for path in paths:
+        if osp.isdir(path):
+            pattern = osp.join(path, "**", "*.json")
+            for filename in sorted(glob.glob(pattern, recursive=True)):
+                yield filename
+        else:
+            yield path
+
+
+def timeit(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t_start = time.time()
+        func()
+        best = min(best, time.time() - t_start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[osp.join(here, "../examples")],
+        help="label files or directories of them",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="best of repeated runs"
+    )
+    args = parser.parse_args()
+
+    texts = []
+    for filename in iter_json_files(args.paths):
+        with io.open(filename, "rb") as f:
+            texts.append(f.read())
+    objs = [utils.json_loads(text, backend="json") for text in texts]
+    print(
+        "{} files, {:.1f} MB".format(
+            len(texts), sum(len(text) for text in texts) / 1024 ** 2
+        )
+    )
+
+    print(
+        "{:<8} {:>10} {:>10} {:>14}  {}".format(
+            "backend", "load [s]", "dump [s]", "dump compact", "size compact"
+        )
+    )
+    for backend in sorted(JSON_BACKENDS):
+        t_load = timeit(
+            lambda: [utils.json_loads(t, backend=backend) for t in texts],
+            args.repeat,
+        )
+        t_dump = timeit(
+            lambda: [utils.json_dumps(o, backend=backend) for o in objs],
+            args.repeat,
+        )
+        t_dump_compact = timeit(
+            lambda: [
+                utils.json_dumps(o, compact=True, backend=backend)
+                for o in objs
+            ],
+            args.repeat,
+        )
+        size_compact = sum(
+            len(utils.json_dumps(o, compact=True, backend=backend))
+            for o in objs
+        )
+        print(
+            "{:<8} {:>10.3f} {:>10.3f} {:>14.3f}  {:.1f} MB".format(
+                backend,
+                t_load,
+                t_dump,
+                t_dump_compact,
+                size_compact / 1024 ** 2,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -56,6 +56,13 @@ def main():
         help="stop storing image data to JSON file",
         default=argparse.SUPPRESS,
     )
+    parser.add_argument(
+        "--imagestore",
+        dest="image_store",
+        help="store image data in a content addressed store in this "
+        "directory (relative to the JSON file) instead of the JSON file",
+        default=argparse.SUPPRESS,
+    )
     parser.add_argument(
         "--autosave",
         dest="auto_save",
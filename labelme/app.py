@@ -18,13 +18,20 @@ from labelme import PY2
 from labelme import QT5
 
 from . import utils
+from labelme.autosave import AutoSaver
 from labelme.config import get_config
+from labelme.file_scanner import DirectoryScanner
+from labelme.file_scanner import get_labeled_files
+from labelme.file_scanner import iter_image_files
 from labelme.label_file import LabelFile
 from labelme.label_file import LabelFileError
 from labelme.logger import logger
+from labelme.prefetch import load_page
+from labelme.prefetch import PagePrefetcher
 from labelme.shape import Shape
 from labelme.widgets import BrightnessContrastDialog
 from labelme.widgets import Canvas
+from labelme.widgets import FileListWidget
 from labelme.widgets import LabelDialog
 from labelme.widgets import LabelListWidget
 from labelme.widgets import LabelListWidgetItem
@@ -85,6 +92,14 @@ class MainWindow(QtWidgets.QMainWindow):
             config = get_config()
         self._config = config
 
+        if self._config["json_backend"] not in utils.JSON_BACKENDS:
+            logger.warning(
+                "JSON backend {} is not installed, using json".format(
+                    self._config["json_backend"]
+                )
+            )
+            self._config["json_backend"] = "json"
+
         # set default shape colors
         Shape.line_color = QtGui.QColor(*self._config["shape"]["line_color"])
         Shape.fill_color = QtGui.QColor(*self._config["shape"]["fill_color"])
@@ -175,10 +190,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.fileSearch = QtWidgets.QLineEdit()
         self.fileSearch.setPlaceholderText(self.tr("Search Filename"))
         self.fileSearch.textChanged.connect(self.fileSearchChanged)
-        self.fileListWidget = QtWidgets.QListWidget()
+        self.fileListWidget = FileListWidget()
         self.fileListWidget.itemSelectionChanged.connect(
             self.fileSelectionChanged
         )
+        self.dirScanner = DirectoryScanner(self)
+        self.dirScanner.filesFound.connect(self.importScannedImages)
+        self._loadScannedImage = None
         fileListLayout = QtWidgets.QVBoxLayout()
         fileListLayout.setContentsMargins(0, 0, 0, 0)
         fileListLayout.setSpacing(0)
@@ -196,6 +214,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.canvas = self.labelList.canvas = Canvas(
             epsilon=self._config["epsilon"],
             double_click=self._config["canvas"]["double_click"],
+            undo_limit=self._config["canvas"]["undo_limit"],
+            pyramid=self._config["canvas"]["pyramid"],
         )
         
         self.labelDialog = LabelDialog(
@@ -524,6 +544,14 @@ class MainWindow(QtWidgets.QMainWindow):
             self.tr("Undo last add and edit of shape"),
             enabled=False,
         )
+        redo = action(
+            self.tr("Redo"),
+            self.redoShapeEdit,
+            shortcuts["redo"],
+            "undo",
+            self.tr("Redo last undone add and edit of shape"),
+            enabled=False,
+        )
 
         hideAll = action(
             self.tr("&Hide\nPolygons"),
@@ -684,6 +712,7 @@ class MainWindow(QtWidgets.QMainWindow):
             copy=copy,
             undoLastPoint=undoLastPoint,
             undo=undo,
+            redo=redo,
             addPointToEdge=addPointToEdge,
             removePoint=removePoint,
             createMode=createMode,
@@ -718,6 +747,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 delete,
                 None,
                 undo,
+                redo,
                 undoLastPoint,
                 None,
                 addPointToEdge,
@@ -743,6 +773,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 copy,
                 delete,
                 undo,
+                redo,
                 undoLastPoint,
                 addPointToEdge,
                 removePoint,
@@ -877,7 +908,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Application state.
         self.image = QtGui.QImage()
-        self.np_image_b = self.np_image_w = None
+        self.binaryImages = None
         self.imagePath = None
         self.recentFiles = []
         self.maxRecent = 7
@@ -890,9 +921,26 @@ class MainWindow(QtWidgets.QMainWindow):
             Qt.Horizontal: {},
             Qt.Vertical: {},
         }  # key=filename, value=scroll_value
+        self.prefetcher = PagePrefetcher(
+            max_workers=self._config["prefetch"]["max_workers"],
+            max_bytes=self._config["prefetch"]["cache_size_mb"] * 1024 ** 2,
+        )
+        self.autoSaver = AutoSaver(self)
+        self.autoSaver.saved.connect(self.autoSaved)
+        self.autoSaver.failed.connect(
+            lambda filename, message: self.errorMessage(
+                self.tr("Error saving label data"),
+                self.tr("<b>%s</b>") % message,
+            )
+        )
+        self.autoSaveTimer = QtCore.QTimer(self)
+        self.autoSaveTimer.setSingleShot(True)
+        self.autoSaveTimer.setInterval(self._config["auto_save_delay"])
+        self.autoSaveTimer.timeout.connect(self.autoSave)
 
         if filename is not None and osp.isdir(filename):
-            self.importDirImages(filename, load=False)
+            # the first image is loaded once the scan finds it
+            self.importDirImages(filename)
         else:
             self.filename = filename
 
@@ -977,15 +1025,13 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def setDirty(self):
         if self._config["auto_save"] or self.actions.saveAuto.isChecked():
-            label_file = osp.splitext(self.imagePath)[0] + ".json"
-            if self.output_dir:
-                label_file_without_path = osp.basename(label_file)
-                label_file = osp.join(self.output_dir, label_file_without_path)
-            self.saveLabels(label_file)
+            # saved once the edits pause, see autoSave()
+            self.autoSaveTimer.start()
             return
         self.dirty = True
         self.actions.save.setEnabled(True)
         self.actions.undo.setEnabled(self.canvas.isShapeRestorable)
+        self.actions.redo.setEnabled(self.canvas.isShapeRedoable)
         title = __appname__
         if self.filename is not None:
             title = "{} - {}*".format(title, self.filename)
@@ -1036,8 +1082,34 @@ class MainWindow(QtWidgets.QMainWindow):
         self.imageData = None
         self.labelFile = None
         self.otherData = None
+        self.binaryImages = None
         self.canvas.resetState()
 
+    @property
+    def np_image_b(self):
+        """無反白圖片"""
+        if self.binaryImages is None:
+            return None
+        return self.binaryImages.get(self._config["cc_threshold"]["black"])
+
+    @property
+    def np_integral_b(self):
+        """Summed-area table of the black pixels of np_image_b"""
+        if self.binaryImages is None:
+            return None
+        return self.binaryImages.integral(
+            self._config["cc_threshold"]["black"]
+        )
+
+    @property
+    def np_image_w(self):
+        """反白圖片"""
+        if self.binaryImages is None:
+            return None
+        return self.binaryImages.get(
+            self._config["cc_threshold"]["white"], invert=True
+        )
+
     def currentItem(self):
         items = self.labelList.selectedItems()
         if items:
@@ -1061,6 +1133,14 @@ class MainWindow(QtWidgets.QMainWindow):
         self.labelList.clear()
         self.loadShapes(self.canvas.shapes)
         self.actions.undo.setEnabled(self.canvas.isShapeRestorable)
+        self.actions.redo.setEnabled(self.canvas.isShapeRedoable)
+
+    def redoShapeEdit(self):
+        self.canvas.redoShape()
+        self.labelList.clear()
+        self.loadShapes(self.canvas.shapes)
+        self.actions.undo.setEnabled(self.canvas.isShapeRestorable)
+        self.actions.redo.setEnabled(self.canvas.isShapeRedoable)
 
     def tutorial(self):
         url = "https://github.com/wkentaro/labelme/tree/master/examples/tutorial"  # NOQA
@@ -1074,6 +1154,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actions.editMode.setEnabled(not drawing)
         self.actions.undoLastPoint.setEnabled(drawing)
         self.actions.undo.setEnabled(not drawing)
+        self.actions.redo.setEnabled(
+            not drawing and self.canvas.isShapeRedoable
+        )
         self.actions.delete.setEnabled(not drawing)
     
     def toggleDrawMode(self, edit=True, createMode="polygon"):
@@ -1188,6 +1271,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 item = QtWidgets.QListWidgetItem()
                 item.setData(Qt.UserRole, shape.label)
                 self.uniqLabelList.addItem(item)
+        self.canvas.storeShapes([item.shape() for item in items])
         # clear selected item
         self.labelList.clearSelection()
         self.setDirty()
@@ -1228,29 +1312,29 @@ class MainWindow(QtWidgets.QMainWindow):
                 item.setData(Qt.UserRole, shape.sub_label)
                 self.uniqSubLabelList.addItem(item)
                 print(f"Add new sub label type {shape.sub_label}.")
+        self.canvas.storeShapes([item.shape() for item in items])
         # clear selected item
         self.labelList.clearSelection()
         self.setDirty()
 
     def fileSearchChanged(self):
-        self.importDirImages(
-            self.lastOpenDir, pattern=self.fileSearch.text(), load=False,
-        )
+        if not self.mayContinue():
+            return
+        self.fileListWidget.setPattern(self.fileSearch.text())
+        self.filename = None
+        self.openNextImg(load=False)
 
     def fileSelectionChanged(self):
-        items = self.fileListWidget.selectedItems()
-        if not items:
+        filenames = self.fileListWidget.selectedFilenames()
+        if not filenames:
             return
-        item = items[0]
 
         if not self.mayContinue():
             return
 
-        currIndex = self.imageList.index(str(item.text()))
-        if currIndex < len(self.imageList):
-            filename = self.imageList[currIndex]
-            if filename:
-                self.loadFile(filename)
+        filename = filenames[0]
+        if filename:
+            self.loadFile(filename)
 
     # React to canvas signals.
     def shapeSelectionChanged(self, selected_shapes):
@@ -1261,6 +1345,7 @@ class MainWindow(QtWidgets.QMainWindow):
         # label = None
         # isSameLabel = False
         self.canvas.selectedShapes = selected_shapes
+        items = []
         for shape in self.canvas.selectedShapes:
             # if not label:
                 # isSameLabel = True
@@ -1268,9 +1353,10 @@ class MainWindow(QtWidgets.QMainWindow):
             # elif label != shape.label:
                 # isSameLabel = False
             shape.selected = True
-            item = self.labelList.findItemByShape(shape)
-            self.labelList.selectItem(item)
-            self.labelList.scrollToItem(item)
+            items.append(self.labelList.findItemByShape(shape))
+        if items:
+            self.labelList.selectItems(items)
+            self.labelList.scrollToItem(items[-1])
         self._noSelectionSlot = False
         n_selected = len(selected_shapes)
         self.actions.delete.setEnabled(n_selected)
@@ -1284,35 +1370,46 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actions.createTextGrid.setEnabled(n_selected == 1)
 
     def addLabel(self, shape):
-        if shape.group_id is None:
-            text = shape.label
-        else:
-            text = "{} ({})".format(shape.label, shape.group_id)
-        label_list_item = LabelListWidgetItem(text, shape)
-        self.labelList.addItem(label_list_item)
-        if not self.uniqLabelList.findItemsByLabel(shape.label):
-            item = self.uniqLabelList.createItemFromLabel(shape.label)
-            self.uniqLabelList.addItem(item)
-            rgb = self._get_rgb_by_label(shape.label)
-            self.uniqLabelList.setItemLabel(item, shape.label, rgb)
-        self.labelDialog.addLabelHistory(shape.label)
-        for action in self.actions.onShapesPresent:
-            action.setEnabled(True)
+        self.addLabels([shape])
 
-        rgb = self._get_rgb_by_label(shape.label)
+    def addLabels(self, shapes):
+        """Add label list items for shapes with a single model insertion."""
+        if not shapes:
+            return
+        rgbs = {}
+        items = []
+        for shape in shapes:
+            if shape.label not in rgbs:
+                if not self.uniqLabelList.findItemsByLabel(shape.label):
+                    item = self.uniqLabelList.createItemFromLabel(shape.label)
+                    self.uniqLabelList.addItem(item)
+                    rgb = self._get_rgb_by_label(shape.label)
+                    self.uniqLabelList.setItemLabel(item, shape.label, rgb)
+                self.labelDialog.addLabelHistory(shape.label)
+                rgbs[shape.label] = self._get_rgb_by_label(shape.label)
+            r, g, b = rgbs[shape.label]
 
-        r, g, b = rgb
-        label_list_item.setText(
-            '{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(
-                text, r, g, b
+            if shape.group_id is None:
+                text = shape.label
+            else:
+                text = "{} ({})".format(shape.label, shape.group_id)
+            items.append(
+                LabelListWidgetItem(
+                    '{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(
+                        text, r, g, b
+                    ),
+                    shape,
+                )
             )
-        )
-        shape.line_color = QtGui.QColor(r, g, b)
-        shape.vertex_fill_color = QtGui.QColor(r, g, b)
-        shape.hvertex_fill_color = QtGui.QColor(255, 255, 255)
-        shape.fill_color = QtGui.QColor(r, g, b, 128)
-        shape.select_line_color = QtGui.QColor(255, 255, 255)
-        shape.select_fill_color = QtGui.QColor(r, g, b, 155)
+            shape.line_color = QtGui.QColor(r, g, b)
+            shape.vertex_fill_color = QtGui.QColor(r, g, b)
+            shape.hvertex_fill_color = QtGui.QColor(255, 255, 255)
+            shape.fill_color = QtGui.QColor(r, g, b, 128)
+            shape.select_line_color = QtGui.QColor(255, 255, 255)
+            shape.select_fill_color = QtGui.QColor(r, g, b, 155)
+        self.labelList.addItems(items)
+        for action in self.actions.onShapesPresent:
+            action.setEnabled(True)
 
     def _get_rgb_by_label(self, label):
         if self._config["shape_color"] == "auto":
@@ -1337,8 +1434,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def loadShapes(self, shapes, replace=True):
         self._noSelectionSlot = True
-        for shape in shapes:
-            self.addLabel(shape)
+        self.addLabels(shapes)
         self.labelList.clearSelection()
         self._noSelectionSlot = False
         self.canvas.loadShapes(shapes, replace=replace)
@@ -1382,8 +1478,30 @@ class MainWindow(QtWidgets.QMainWindow):
             item.setCheckState(Qt.Checked if flag else Qt.Unchecked)
             self.flag_widget.addItem(item)
 
-    def saveLabels(self, filename):
-        lf = LabelFile()
+    def autoSave(self):
+        if self.imagePath is None:
+            return
+        label_file = self.getOutputLabelFile(self.imagePath)
+        self.autoSaver.save(label_file, **self.labelFileData(label_file))
+        self.prefetcher.invalidate(label_file)
+        self.fileListWidget.setLabeled(self.imagePath, True)
+
+    def autoSaved(self, labelFile):
+        self.prefetcher.invalidate(labelFile.filename)
+        if self.imagePath and labelFile.filename == self.getOutputLabelFile(
+            self.imagePath
+        ):
+            self.labelFile = labelFile
+
+    def flushAutoSave(self):
+        """Write the pending auto save and wait for it to finish."""
+        if self.autoSaveTimer.isActive():
+            self.autoSaveTimer.stop()
+            self.autoSave()
+        self.autoSaver.wait()
+
+    def labelFileData(self, filename):
+        """Snapshot the current annotation as arguments of LabelFile.save."""
 
         def format_shape(s):
             data = s.other_data.copy()
@@ -1394,7 +1512,7 @@ class MainWindow(QtWidgets.QMainWindow):
                     points=[(p.x(), p.y()) for p in s.points],
                     group_id=s.group_id,
                     shape_type=s.shape_type,
-                    flags=s.flags,
+                    flags=None if s.flags is None else dict(s.flags),
                 )
             )
             return data
@@ -1405,29 +1523,36 @@ class MainWindow(QtWidgets.QMainWindow):
             key = item.text()
             flag = item.checkState() == Qt.Checked
             flags[key] = flag
+        # files which refer to an image store keep using it
+        imageStore = self._config["image_store"]
+        if imageStore is None and self.labelFile:
+            imageStore = self.labelFile.imageStore
+        return dict(
+            shapes=shapes,
+            imagePath=osp.relpath(self.imagePath, osp.dirname(filename)),
+            imageData=self.imageData if self._config["store_data"] else None,
+            imageStore=imageStore,
+            imageHeight=self.image.height(),
+            imageWidth=self.image.width(),
+            otherData=dict(self.otherData or {}),
+            flags=flags,
+            compact=self._config["compact_json"],
+            jsonBackend=self._config["json_backend"],
+        )
+
+    def saveLabels(self, filename):
+        # the current annotation supersedes a pending auto save
+        self.autoSaveTimer.stop()
+        self.autoSaver.wait()
+        lf = LabelFile()
         try:
-            imagePath = osp.relpath(self.imagePath, osp.dirname(filename))
-            imageData = self.imageData if self._config["store_data"] else None
+            data = self.labelFileData(filename)
             if osp.dirname(filename) and not osp.exists(osp.dirname(filename)):
                 os.makedirs(osp.dirname(filename))
-            lf.save(
-                filename=filename,
-                shapes=shapes,
-                imagePath=imagePath,
-                imageData=imageData,
-                imageHeight=self.image.height(),
-                imageWidth=self.image.width(),
-                otherData=self.otherData,
-                flags=flags,
-            )
+            lf.save(filename=filename, **data)
+            self.prefetcher.invalidate(filename)
             self.labelFile = lf
-            items = self.fileListWidget.findItems(
-                self.imagePath, Qt.MatchExactly
-            )
-            if len(items) > 0:
-                if len(items) != 1:
-                    raise RuntimeError("There are duplicate files.")
-                items[0].setCheckState(Qt.Checked)
+            self.fileListWidget.setLabeled(self.imagePath, True)
             # disable allows next and previous image to proceed
             # self.filename = filename
             return True
@@ -1440,8 +1565,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def copySelectedShape(self):
         added_shapes = self.canvas.copySelectedShapes()
         self.labelList.clearSelection()
-        for shape in added_shapes:
-            self.addLabel(shape)
+        self.addLabels(added_shapes)
         self.setDirty()
 
     def labelSelectionChanged(self):
@@ -1485,8 +1609,8 @@ class MainWindow(QtWidgets.QMainWindow):
                     shape.label = text
                     shape.flags = flags
                     shape.group_id = group_id
-                    self.canvas.shapes.append(shape)
-                    self.addLabel(shape)
+                self.canvas.addShapes(grids)
+                self.addLabels(grids)
 
                 self.canvas.storeShapes()
                 self.canvas.update()
@@ -1520,15 +1644,14 @@ class MainWindow(QtWidgets.QMainWindow):
         if text:
             if len(newShape) != 0:
                 minVal = self.canvas.minArea
-                for cc in newShape:
-                    if cc[1] < minVal:
-                        continue
-                    cc[0].label = text
-                    cc[0].flags = flags
-                    cc[0].group_id = group_id
-                    # 增加shape到container
-                    self.canvas.shapes.append(cc[0])
-                    self.addLabel(cc[0])
+                ccShapes = [cc[0] for cc in newShape if cc[1] >= minVal]
+                for shape in ccShapes:
+                    shape.label = text
+                    shape.flags = flags
+                    shape.group_id = group_id
+                # 增加shape到container
+                self.canvas.addShapes(ccShapes)
+                self.addLabels(ccShapes)
                 # 增加到backup
                 self.canvas.storeShapes()
                 self.canvas.update()
@@ -1547,8 +1670,8 @@ class MainWindow(QtWidgets.QMainWindow):
         if self.canvas.createMode == "merge_rectangle":
             shape = self.canvas.shapes[-1]
             # 清除外框
-            self.canvas.shapes.pop()
-            self.canvas.shapesBackups.pop()
+            self.canvas.removeShapes([shape])
+            self.canvas.discardLastStore()
             
             deletedShapes = []
             shapeGroups = utils.merge_rectangle_inside_rectangle_with_same_label(shape, self.canvas.shapes)
@@ -1562,7 +1685,7 @@ class MainWindow(QtWidgets.QMainWindow):
                     shape = group[0][0]
                     # remove first shape
                     deletedShapes.append(shape)
-                    self.canvas.shapes.remove(shape)
+                    self.canvas.removeShapes([shape])
                     # assign to initialize shape
                     box = group[0][1]
                     newShape = box.copy()
@@ -1570,7 +1693,7 @@ class MainWindow(QtWidgets.QMainWindow):
                         shape = group[i][0]
                         # remove list from shape list
                         deletedShapes.append(shape)
-                        self.canvas.shapes.remove(shape)
+                        self.canvas.removeShapes([shape])
                         # update merge box
                         box = group[i][1]
                         newShape['xmin'] = min(newShape['xmin'], box['xmin'])
@@ -1582,6 +1705,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 # remove from label list (window?)
                 self.remLabels(deletedShapes)
                 
+                mergedShapes = []
                 for newShape, label in zip(newShapes, labels):
                     # generate new shape
                     shape = Shape()
@@ -1593,9 +1717,10 @@ class MainWindow(QtWidgets.QMainWindow):
                     shape.label = label
                     shape.flags = {}
                     shape.group_id = None
-                    # add to shape list
-                    self.canvas.shapes.append(shape)
-                    self.addLabel(shape)
+                    mergedShapes.append(shape)
+                # add to shape list
+                self.canvas.addShapes(mergedShapes)
+                self.addLabels(mergedShapes)
                 # 
                 self.canvas.storeShapes()
                 self.canvas.update()
@@ -1640,19 +1765,20 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.labelList.clearSelection()
                 if self.canvas.createMode=="cc_rectangle":
                     # 清除外框
-                    self.canvas.shapes.pop()
-                    self.canvas.shapesBackups.pop()
+                    self.canvas.removeShapes(self.canvas.shapes[-1:])
+                    self.canvas.discardLastStore()
                     if len(ccRegion) != 0:
                         minVal = self.canvas.minArea
-                        for cc in ccRegion:
-                            if cc[1] < minVal:
-                                continue
-                            cc[0].label = text
-                            cc[0].flags = flags
-                            cc[0].group_id = group_id
-                            # 增加shape到container
-                            self.canvas.shapes.append(cc[0])
-                            self.addLabel(cc[0])
+                        ccShapes = [
+                            cc[0] for cc in ccRegion if cc[1] >= minVal
+                        ]
+                        for shape in ccShapes:
+                            shape.label = text
+                            shape.flags = flags
+                            shape.group_id = group_id
+                        # 增加shape到container
+                        self.canvas.addShapes(ccShapes)
+                        self.addLabels(ccShapes)
                         # 增加到backup
                     self.canvas.storeShapes()
                     self.canvas.update()
@@ -1669,7 +1795,7 @@ class MainWindow(QtWidgets.QMainWindow):
             else:
                 # 沒輸入group，不增加新shape
                 self.canvas.undoLastLine()
-                self.canvas.shapesBackups.pop()
+                self.canvas.discardLastStore()
 
     def scrollRequest(self, delta, orientation):
         units = -delta * 0.1  # natural scroll
@@ -1727,7 +1853,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def onNewBrightnessContrast(self, qimage):
         self.canvas.loadPixmap(
-            QtGui.QPixmap.fromImage(qimage), clear_shapes=False
+            QtGui.QPixmap.fromImage(qimage), clear_shapes=False, image=qimage
         )
 
     def brightnessContrast(self, value):
@@ -1763,11 +1889,11 @@ class MainWindow(QtWidgets.QMainWindow):
     # 切換圖片
     def loadFile(self, filename=None):
         """Load the specified file, or the last opened file if None."""
+        self.flushAutoSave()
         # changing fileListWidget loads file
-        if filename in self.imageList and (
-            self.fileListWidget.currentRow() != self.imageList.index(filename)
-        ):
-            self.fileListWidget.setCurrentRow(self.imageList.index(filename))
+        row = self.fileListWidget.row(filename)
+        if row >= 0 and self.fileListWidget.currentRow() != row:
+            self.fileListWidget.setCurrentRow(row)
             self.fileListWidget.repaint()
             return
         self.resetState()
@@ -1783,15 +1909,11 @@ class MainWindow(QtWidgets.QMainWindow):
             return False
         # assumes same name, but json extension
         self.status(self.tr("Loading %s...") % osp.basename(str(filename)))
-        label_file = osp.splitext(filename)[0] + ".json"
-        if self.output_dir:
-            label_file_without_path = osp.basename(label_file)
-            label_file = osp.join(self.output_dir, label_file_without_path)
-        if QtCore.QFile.exists(label_file) and LabelFile.is_label_file(
-            label_file
-        ):
+        label_file = self.getOutputLabelFile(filename)
+        page = self.prefetcher.get(filename, label_file)
+        if page is None:
             try:
-                self.labelFile = LabelFile(label_file)
+                page = load_page(filename, label_file)
             except LabelFileError as e:
                 self.errorMessage(
                     self.tr("Error opening file"),
@@ -1803,17 +1925,12 @@ class MainWindow(QtWidgets.QMainWindow):
                 )
                 self.status(self.tr("Error reading %s") % label_file)
                 return False
-            self.imageData = self.labelFile.imageData
-            self.imagePath = osp.join(
-                osp.dirname(label_file), self.labelFile.imagePath,
-            )
+        self.labelFile = page.labelFile
+        self.imageData = page.imageData
+        self.imagePath = page.imagePath
+        if self.labelFile:
             self.otherData = self.labelFile.otherData
-        else:
-            self.imageData = LabelFile.load_image_file(filename)
-            if self.imageData:
-                self.imagePath = filename
-            self.labelFile = None
-        image = QtGui.QImage.fromData(self.imageData)
+        image = page.image
         if image.isNull():
             formats = [
                 "*.{}".format(fmt.data().decode())
@@ -1829,13 +1946,12 @@ class MainWindow(QtWidgets.QMainWindow):
             self.status(self.tr("Error reading %s") % filename)
             return False
         self.image = image
-        # np_image_b : 無反白圖片
-        # np_image_w : 反白圖片
-        self.np_image_b, self.np_image_w = utils.qimage_to_np_array(image)
+        # binarized only when the CC tools need it
+        self.binaryImages = utils.BinaryImageCache(image)
         self.filename = filename
         if self._config["keep_prev"]:
             prev_shapes = self.canvas.shapes
-        self.canvas.loadPixmap(QtGui.QPixmap.fromImage(image))
+        self.canvas.loadPixmap(QtGui.QPixmap.fromImage(image), image=image)
         flags = {k: False for k in self._config["flags"] or []}
         if self.labelFile:
             self.loadLabels(self.labelFile.shapes)
@@ -1862,11 +1978,6 @@ class MainWindow(QtWidgets.QMainWindow):
                     orientation, self.scroll_values[orientation][self.filename]
                 )
         # set brightness constrast values
-        dialog = BrightnessContrastDialog(
-            utils.img_data_to_pil(self.imageData),
-            self.onNewBrightnessContrast,
-            parent=self,
-        )
         brightness, contrast = self.brightnessContrast_values.get(
             self.filename, (None, None)
         )
@@ -1878,19 +1989,58 @@ class MainWindow(QtWidgets.QMainWindow):
             _, contrast = self.brightnessContrast_values.get(
                 self.recentFiles[0], (None, None)
             )
-        if brightness is not None:
-            dialog.slider_brightness.setValue(brightness)
-        if contrast is not None:
-            dialog.slider_contrast.setValue(contrast)
         self.brightnessContrast_values[self.filename] = (brightness, contrast)
         if brightness is not None or contrast is not None:
+            dialog = BrightnessContrastDialog(
+                utils.img_data_to_pil(self.imageData),
+                self.onNewBrightnessContrast,
+                parent=self,
+            )
+            if brightness is not None:
+                dialog.slider_brightness.setValue(brightness)
+            if contrast is not None:
+                dialog.slider_contrast.setValue(contrast)
             dialog.onNewValue(None)
         self.paintCanvas()
         self.addRecentFile(self.filename)
         self.toggleActions(True)
         self.status(self.tr("Loaded %s") % osp.basename(str(filename)))
+        self.prefetchNeighbours()
         return True
 
+    def getOutputLabelFile(self, filename):
+        if LabelFile.is_npz_file(filename):
+            label_file = filename
+        else:
+            label_file = osp.splitext(filename)[0] + ".json"
+        if self.output_dir:
+            label_file_without_path = osp.basename(label_file)
+            label_file = osp.join(self.output_dir, label_file_without_path)
+        return self._findLabelFile(label_file)
+
+    @staticmethod
+    def _findLabelFile(label_file):
+        # an image labeled only in .npz keeps its labels there
+        if not osp.exists(label_file):
+            for suffix in LabelFile.suffixes:
+                other = osp.splitext(label_file)[0] + suffix
+                if osp.exists(other):
+                    return other
+        return label_file
+
+    def prefetchNeighbours(self):
+        num_pages = self._config["prefetch"]["num_pages"]
+        currIndex = self.fileListWidget.row(self.filename)
+        if not num_pages or currIndex < 0:
+            return
+        for i in range(1, num_pages + 1):
+            for index in [currIndex + i, currIndex - i]:
+                if 0 <= index < self.fileListWidget.count():
+                    filename = self.fileListWidget.filename(index)
+                    self.prefetcher.prefetch(
+                        filename, self.getOutputLabelFile(filename)
+                    )
+
     def resizeEvent(self, event):
         if (
             self.canvas
@@ -1934,8 +2084,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actions.saveWithImageData.setChecked(enabled)
 
     def closeEvent(self, event):
+        self.flushAutoSave()
         if not self.mayContinue():
             event.ignore()
+        else:
+            self.dirScanner.cancel()
+            self.prefetcher.shutdown()
+            self.autoSaver.shutdown()
         self.settings.setValue(
             "filename", self.filename if self.filename else ""
         )
@@ -1979,15 +2134,15 @@ class MainWindow(QtWidgets.QMainWindow):
         if not self.mayContinue():
             return
 
-        if len(self.imageList) <= 0:
+        if self.fileListWidget.count() <= 0:
             return
 
         if self.filename is None:
             return
 
-        currIndex = self.imageList.index(self.filename)
+        currIndex = self.fileListWidget.row(self.filename)
         if currIndex - 1 >= 0:
-            filename = self.imageList[currIndex - 1]
+            filename = self.fileListWidget.filename(currIndex - 1)
             if filename:
                 self.loadFile(filename)
 
@@ -2001,18 +2156,19 @@ class MainWindow(QtWidgets.QMainWindow):
         if not self.mayContinue():
             return
 
-        if len(self.imageList) <= 0:
+        count = self.fileListWidget.count()
+        if count <= 0:
             return
 
         filename = None
         if self.filename is None:
-            filename = self.imageList[0]
+            filename = self.fileListWidget.filename(0)
         else:
-            currIndex = self.imageList.index(self.filename)
-            if currIndex + 1 < len(self.imageList):
-                filename = self.imageList[currIndex + 1]
+            currIndex = self.fileListWidget.row(self.filename)
+            if currIndex + 1 < count:
+                filename = self.fileListWidget.filename(currIndex + 1)
             else:
-                filename = self.imageList[-1]
+                filename = self.fileListWidget.filename(count - 1)
         self.filename = filename
 
         if self.filename and load:
@@ -2029,7 +2185,7 @@ class MainWindow(QtWidgets.QMainWindow):
             for fmt in QtGui.QImageReader.supportedImageFormats()
         ]
         filters = self.tr("Image & Label files (%s)") % " ".join(
-            formats + ["*%s" % LabelFile.suffix]
+            formats + ["*%s" % suffix for suffix in LabelFile.suffixes]
         )
         filename = QtWidgets.QFileDialog.getOpenFileName(
             self,
@@ -2062,7 +2218,9 @@ class MainWindow(QtWidgets.QMainWindow):
         if not output_dir:
             return
 
+        self.flushAutoSave()
         self.output_dir = output_dir
+        self.prefetcher.clear()
 
         self.statusBar().showMessage(
             self.tr("%s . Annotations will be saved/loaded in %s")
@@ -2070,15 +2228,14 @@ class MainWindow(QtWidgets.QMainWindow):
         )
         self.statusBar().show()
 
-        current_filename = self.filename
-        self.importDirImages(self.lastOpenDir, load=False)
-
-        if current_filename in self.imageList:
-            # retain currently selected file
-            self.fileListWidget.setCurrentRow(
-                self.imageList.index(current_filename)
+        # the label files are looked up in the new directory
+        self.fileListWidget.model().resetLabeled(
+            get_labeled_files(
+                self.fileListWidget.model().allFilenames(), self.output_dir
             )
-            self.fileListWidget.repaint()
+        )
+        if self.filename and self.mayContinue():
+            self.loadFile(self.filename)
 
     def saveFile(self, _value=False):
         assert not self.image.isNull(), "cannot save empty image"
@@ -2097,7 +2254,9 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def saveFileDialog(self):
         caption = self.tr("%s - Choose File") % __appname__
-        filters = self.tr("Label files (*%s)") % LabelFile.suffix
+        filters = self.tr("Label files (%s)") % " ".join(
+            "*%s" % suffix for suffix in LabelFile.suffixes
+        )
         if self.output_dir:
             dlg = QtWidgets.QFileDialog(
                 self, caption, self.output_dir, filters
@@ -2123,7 +2282,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self,
             self.tr("Choose File"),
             default_labelfile_name,
-            self.tr("Label files (*%s)") % LabelFile.suffix,
+            filters,
         )
         if isinstance(filename, tuple):
             filename, _ = filename
@@ -2144,10 +2303,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actions.saveAs.setEnabled(False)
 
     def getLabelFile(self):
-        if self.filename.lower().endswith(".json"):
+        if LabelFile.is_label_file(self.filename):
             label_file = self.filename
         else:
-            label_file = osp.splitext(self.filename)[0] + ".json"
+            label_file = self._findLabelFile(
+                osp.splitext(self.filename)[0] + ".json"
+            )
 
         return label_file
 
@@ -2161,13 +2322,15 @@ class MainWindow(QtWidgets.QMainWindow):
         if answer != mb.Yes:
             return
 
+        # a pending auto save would bring the label file back
+        self.flushAutoSave()
         label_file = self.getLabelFile()
         if osp.exists(label_file):
             os.remove(label_file)
+            self.prefetcher.invalidate(label_file)
             logger.info("Label file is removed: {}".format(label_file))
 
-            item = self.fileListWidget.currentItem()
-            item.setCheckState(Qt.Unchecked)
+            self.fileListWidget.setLabeled(self.filename, False)
 
             self.resetState()
 
@@ -2239,8 +2402,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def copyShape(self):
         self.canvas.endMove(copy=True)
         self.labelList.clearSelection()
-        for shape in self.canvas.selectedShapes:
-            self.addLabel(shape)
+        self.addLabels(self.canvas.selectedShapes)
         self.setDirty()
 
     def moveShape(self):
@@ -2272,11 +2434,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     @property
     def imageList(self):
-        lst = []
-        for i in range(self.fileListWidget.count()):
-            item = self.fileListWidget.item(i)
-            lst.append(item.text())
-        return lst
+        return self.fileListWidget.filenames()
 
     def importDroppedImageFiles(self, imageFiles):
         extensions = [
@@ -2285,26 +2443,21 @@ class MainWindow(QtWidgets.QMainWindow):
         ]
 
         self.filename = None
+        filenames = []
         for file in imageFiles:
-            if file in self.imageList or not file.lower().endswith(
-                tuple(extensions)
+            if (
+                file in self.fileListWidget.model()
+                or file in filenames
+                or not file.lower().endswith(tuple(extensions))
             ):
                 continue
-            label_file = osp.splitext(file)[0] + ".json"
-            if self.output_dir:
-                label_file_without_path = osp.basename(label_file)
-                label_file = osp.join(self.output_dir, label_file_without_path)
-            item = QtWidgets.QListWidgetItem(file)
-            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            if QtCore.QFile.exists(label_file) and LabelFile.is_label_file(
-                label_file
-            ):
-                item.setCheckState(Qt.Checked)
-            else:
-                item.setCheckState(Qt.Unchecked)
-            self.fileListWidget.addItem(item)
+            filenames.append(file)
+        labeled = get_labeled_files(filenames, self.output_dir)
+        self.fileListWidget.addFiles(
+            filenames, [file in labeled for file in filenames]
+        )
 
-        if len(self.imageList) > 1:
+        if self.fileListWidget.count() > 1:
             self.actions.openNextImg.setEnabled(True)
             self.actions.openPrevImg.setEnabled(True)
 
@@ -2320,35 +2473,31 @@ class MainWindow(QtWidgets.QMainWindow):
         self.lastOpenDir = dirpath
         self.filename = None
         self.fileListWidget.clear()
-        for filename in self.scanAllImages(dirpath):
-            if pattern and pattern not in filename:
-                continue
-            label_file = osp.splitext(filename)[0] + ".json"
-            if self.output_dir:
-                label_file_without_path = osp.basename(label_file)
-                label_file = osp.join(self.output_dir, label_file_without_path)
-            item = QtWidgets.QListWidgetItem(filename)
-            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            if QtCore.QFile.exists(label_file) and LabelFile.is_label_file(
-                label_file
-            ):
-                item.setCheckState(Qt.Checked)
-            else:
-                item.setCheckState(Qt.Unchecked)
-            self.fileListWidget.addItem(item)
-        self.openNextImg(load=load)
-
-    def scanAllImages(self, folderPath):
-        extensions = [
+        if pattern is not None:
+            self.fileListWidget.setPattern(pattern)
+        # scanned in the background, see importScannedImages
+        self._loadScannedImage = load
+        self.dirScanner.scan(
+            dirpath, self.imageExtensions(), output_dir=self.output_dir
+        )
+
+    def importScannedImages(self, filenames, labeled):
+        self.fileListWidget.addFiles(filenames, labeled)
+        if self._loadScannedImage is not None and self.fileListWidget.count():
+            load = self._loadScannedImage
+            self._loadScannedImage = None
+            self.openNextImg(load=load)
+
+    def imageExtensions(self):
+        return [
             ".%s" % fmt.data().decode().lower()
             for fmt in QtGui.QImageReader.supportedImageFormats()
         ]
 
-        images = []
-        for root, dirs, files in os.walk(folderPath):
-            for file in files:
-                if file.lower().endswith(tuple(extensions)):
-                    relativePath = osp.join(root, file)
-                    images.append(relativePath)
-        images.sort(key=lambda x: x.lower())
-        return images
+    def scanAllImages(self, folderPath):
+        return [
+            filename
+            for filename, _ in iter_image_files(
+                folderPath, self.imageExtensions()
+            )
+        ]
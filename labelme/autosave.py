@@ -0,0 +1,63 @@
+import concurrent.futures
+import os
+import os.path as osp
+import threading
+
+from qtpy import QtCore
+
+from labelme.label_file import LabelFile
+from labelme.label_file import LabelFileError
+
+
+class AutoSaver(QtCore.QObject):
+    """Write label files in a background thread.
+
+    The data passed to save() must be a snapshot which is not modified
+    afterwards. Saves of the same file are coalesced: if the file is
+    saved again before the worker gets to it, only the latest data is
+    written. saved(labelFile) and failed(filename, message) are emitted
+    once a file is written or cannot be written.
+    """
+
+    saved = QtCore.Signal(object)
+    failed = QtCore.Signal(str, str)
+
+    def __init__(self, parent=None):
+        super(AutoSaver, self).__init__(parent)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        self._pending = {}  # filename -> keyword arguments of save
+        self._futures = []
+
+    def save(self, filename, **kwargs):
+        with self._lock:
+            queued = filename in self._pending
+            self._pending[filename] = kwargs
+            if queued:
+                return
+            self._futures = [f for f in self._futures if not f.done()]
+            self._futures.append(self._executor.submit(self._write, filename))
+
+    def _write(self, filename):
+        with self._lock:
+            kwargs = self._pending.pop(filename)
+        labelFile = LabelFile()
+        try:
+            if osp.dirname(filename) and not osp.exists(osp.dirname(filename)):
+                os.makedirs(osp.dirname(filename))
+            labelFile.save(filename=filename, **kwargs)
+        except (LabelFileError, OSError) as e:
+            self.failed.emit(filename, str(e))
+            return
+        self.saved.emit(labelFile)
+
+    def wait(self):
+        """Block until all the requested saves are written."""
+        with self._lock:
+            futures = self._futures
+            self._futures = []
+        concurrent.futures.wait(futures)
+
+    def shutdown(self):
+        self.wait()
+        self._executor.shutdown()
@@ -2,5 +2,8 @@
 
 from . import draw_json
 from . import draw_label_png
+from . import export
+from . import image_store
+from . import index
 from . import json_to_dataset
 from . import on_docker
@@ -0,0 +1,561 @@
+import argparse
+import collections
+import concurrent.futures
+import datetime
+import functools
+import glob
+import hashlib
+import json
+import os
+import os.path as osp
+import sys
+
+import imgviz
+import numpy as np
+import PIL.Image
+
+from labelme.label_file import get_unique_label_files
+from labelme.label_file import LabelFile
+from labelme.logger import logger
+from labelme import utils
+
+try:
+    import pycocotools.mask
+except ImportError:
+    pycocotools = None
+
+
+FORMATS = ["voc", "voc-instance", "coco"]
+
+EXPORT_DIR = ".labelme_export"  # manifest, options and cached fragments
+
+
+def load_labels(labels_file):
+    """Read a labels file whose first line is __ignore__ (id -1)."""
+    class_names = []
+    class_name_to_id = {}
+    with open(labels_file) as f:
+        lines = f.readlines()
+    for i, line in enumerate(lines):
+        class_id = i - 1  # starts with -1
+        class_name = line.strip()
+        class_name_to_id[class_name] = class_id
+        if class_id == -1:
+            assert class_name == "__ignore__"
+            continue
+        class_names.append(class_name)
+    return tuple(class_names), class_name_to_id
+
+
+def get_output_dirs(dataset_format, noviz=False):
+    if dataset_format == "coco":
+        return ["JPEGImages"]
+    dirs = ["JPEGImages", "SegmentationClass", "SegmentationClassPNG"]
+    if not noviz:
+        dirs.append("SegmentationClassVisualization")
+    if dataset_format == "voc-instance":
+        dirs += ["SegmentationObject", "SegmentationObjectPNG"]
+        if not noviz:
+            dirs.append("SegmentationObjectVisualization")
+    return dirs
+
+
+def _write_bytes(filename, data):
+    with open(filename, "wb") as f:
+        f.write(data)
+
+
+def export_voc(
+    filename, output_dir, class_names, class_name_to_id, instance, noviz
+):
+    """Write the VOC files of a label file, and return their paths."""
+    label_file = LabelFile(filename=filename)
+    base = osp.splitext(osp.basename(filename))[0]
+    outputs = []
+
+    def save(out_dir, ext, save_func, data):
+        out_file = osp.join(output_dir, out_dir, base + ext)
+        save_func(out_file, data)
+        outputs.append(osp.relpath(out_file, output_dir))
+
+    img = utils.img_data_to_arr(label_file.imageData)
+    if instance:
+        save("JPEGImages", ".jpg", imgviz.io.imsave, img)
+    else:
+        save("JPEGImages", ".jpg", _write_bytes, label_file.imageData)
+
+    cls, ins = utils.shapes_to_label(
+        img_shape=img.shape,
+        shapes=label_file.shapes,
+        label_name_to_value=class_name_to_id,
+    )
+    ins[cls == -1] = 0  # ignore it.
+
+    save("SegmentationClassPNG", ".png", utils.lblsave, cls)
+    save("SegmentationClass", ".npy", np.save, cls)
+    if not noviz:
+        clsv = imgviz.label2rgb(
+            label=cls,
+            img=imgviz.rgb2gray(img),
+            label_names=class_names,
+            font_size=15,
+            loc="rb",
+        )
+        save("SegmentationClassVisualization", ".jpg", imgviz.io.imsave, clsv)
+
+    if instance:
+        save("SegmentationObjectPNG", ".png", utils.lblsave, ins)
+        save("SegmentationObject", ".npy", np.save, ins)
+        if not noviz:
+            instance_names = [str(i) for i in range(ins.max() + 1)]
+            insv = imgviz.label2rgb(
+                label=ins,
+                img=imgviz.rgb2gray(img),
+                label_names=instance_names,
+                font_size=15,
+                loc="rb",
+            )
+            save(
+                "SegmentationObjectVisualization",
+                ".jpg",
+                imgviz.io.imsave,
+                insv,
+            )
+
+    return dict(outputs=outputs)
+
+
+def export_coco(filename, output_dir, class_name_to_id):
+    """Write the image of a label file and return its COCO entries.
+
+    The image and annotations are returned as fragment, without ids
+    which are given when the annotation file is written.
+    """
+    label_file = LabelFile(filename=filename)
+    base = osp.splitext(osp.basename(filename))[0]
+    out_img_file = osp.join(output_dir, "JPEGImages", base + ".jpg")
+
+    img = utils.img_data_to_arr(label_file.imageData)
+    PIL.Image.fromarray(img).convert("RGB").save(out_img_file)
+    image = dict(
+        license=0,
+        url=None,
+        file_name=osp.relpath(out_img_file, output_dir),
+        height=img.shape[0],
+        width=img.shape[1],
+        date_captured=None,
+    )
+
+    masks = {}  # for area
+    segmentations = collections.defaultdict(list)  # for segmentation
+    for i, shape in enumerate(label_file.shapes):
+        points = shape["points"]
+        label = shape["label"]
+        group_id = shape.get("group_id")
+        shape_type = shape.get("shape_type", "polygon")
+        mask = utils.shape_to_mask(img.shape[:2], points, shape_type)
+
+        if group_id is None:
+            group_id = (None, i)  # ungrouped shapes are own instances
+
+        instance = (label, group_id)
+
+        if instance in masks:
+            masks[instance] = masks[instance] | mask
+        else:
+            masks[instance] = mask
+
+        if shape_type == "rectangle":
+            (x1, y1), (x2, y2) = points
+            x1, x2 = sorted([x1, x2])
+            y1, y2 = sorted([y1, y2])
+            points = [x1, y1, x2, y1, x2, y2, x1, y2]
+        else:
+            points = np.asarray(points).flatten().tolist()
+
+        segmentations[instance].append(points)
+
+    annotations = []
+    for instance, mask in masks.items():
+        cls_name, group_id = instance
+        if cls_name not in class_name_to_id:
+            continue
+        cls_id = class_name_to_id[cls_name]
+
+        mask = np.asfortranarray(mask.astype(np.uint8))
+        mask = pycocotools.mask.encode(mask)
+        area = float(pycocotools.mask.area(mask))
+        bbox = pycocotools.mask.toBbox(mask).flatten().tolist()
+
+        annotations.append(
+            dict(
+                category_id=cls_id,
+                segmentation=segmentations[instance],
+                area=area,
+                bbox=bbox,
+                iscrowd=0,
+            )
+        )
+
+    return dict(
+        outputs=[image["file_name"]],
+        fragment=dict(image=image, annotations=annotations),
+    )
+
+
+def get_file_sha1(filename):
+    sha1 = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 ** 2), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def is_unchanged(filename, entry):
+    """Return True if the label file is the one recorded in the entry."""
+    if entry is None:
+        return False
+    st = os.stat(filename)
+    if st.st_size != entry["size"]:
+        return False
+    if st.st_mtime == entry["mtime"]:
+        return True
+    if get_file_sha1(filename) != entry["sha1"]:
+        return False
+    entry["mtime"] = st.st_mtime  # only touched, so skip hashing next time
+    return True
+
+
+def _export(func, export_dir, filename):
+    # runs in the worker processes, so errors are returned not raised
+    name = osp.basename(filename)
+    try:
+        st = os.stat(filename)
+        sha1 = get_file_sha1(filename)
+        result = func(filename)
+        entry = dict(
+            filename=name,
+            mtime=st.st_mtime,
+            size=st.st_size,
+            sha1=sha1,
+            outputs=result["outputs"],
+        )
+        if "fragment" in result:
+            entry["fragment"] = osp.join(
+                "fragments", osp.splitext(name)[0] + ".json"
+            )
+            with open(osp.join(export_dir, entry["fragment"]), "w") as f:
+                json.dump(result["fragment"], f)
+    except Exception as e:
+        return dict(
+            filename=name, error="{}: {}".format(type(e).__name__, e)
+        )
+    return entry
+
+
+def imap_ordered(executor, func, items, window):
+    """Like executor.map, but with at most window items in flight."""
+    futures = collections.deque()
+    try:
+        for item in items:
+            futures.append(executor.submit(func, item))
+            if len(futures) >= window:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def read_manifest(manifest_file):
+    """Return the entries of the manifest, keyed by the label file name.
+
+    The manifest is appended to while exporting, so later lines override
+    earlier ones and a line with deleted=true removes the entry.
+    """
+    manifest = collections.OrderedDict()
+    if not osp.exists(manifest_file):
+        return manifest
+    with open(manifest_file) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # interrupted while writing the line
+            if entry.get("deleted"):
+                manifest.pop(entry["filename"], None)
+            else:
+                manifest[entry["filename"]] = entry
+    return manifest
+
+
+def write_manifest(manifest_file, manifest):
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        for name in sorted(manifest):
+            f.write(json.dumps(manifest[name]) + "\n")
+    os.replace(tmp_file, manifest_file)
+
+
+def remove_outputs(output_dir, outputs):
+    for output in outputs:
+        output = osp.join(output_dir, output)
+        if osp.exists(output):
+            os.remove(output)
+
+
+def find_outputs(output_dir, out_dirs, stem):
+    """Return the files named stem (with any extension) in out_dirs."""
+    outputs = []
+    for out_dir in out_dirs:
+        pattern = osp.join(output_dir, out_dir, glob.escape(stem) + ".*")
+        for output in glob.glob(pattern):
+            if osp.splitext(osp.basename(output))[0] == stem:
+                outputs.append(osp.relpath(output, output_dir))
+    return outputs
+
+
+def write_coco(out_file, class_names, class_name_to_id, fragments):
+    now = datetime.datetime.now()
+
+    with utils.CocoWriter(
+        out_file,
+        info=dict(
+            description=None,
+            url=None,
+            version=None,
+            year=now.year,
+            contributor=None,
+            date_created=now.strftime("%Y-%m-%d %H:%M:%S.%f"),
+        ),
+        licenses=[dict(url=None, id=0, name=None,)],
+        type="instances",
+    ) as writer:
+        for class_name in class_names:
+            writer.add_category(
+                dict(
+                    supercategory=None,
+                    id=class_name_to_id[class_name],
+                    name=class_name,
+                )
+            )
+
+        for image_id, fragment in enumerate(fragments):
+            writer.add_image(dict(fragment["image"], id=image_id))
+            for annotation in fragment["annotations"]:
+                writer.add_annotation(
+                    dict(
+                        annotation,
+                        id=writer.num_annotations,
+                        image_id=image_id,
+                    )
+                )
+
+
+def _iter_fragments(export_dir, entries):
+    for entry in entries:
+        with open(osp.join(export_dir, entry["fragment"])) as f:
+            yield json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("input_dir", help="input annotated directory")
+    parser.add_argument("output_dir", help="output dataset directory")
+    parser.add_argument("--labels", help="labels file", required=True)
+    parser.add_argument(
+        "--format", choices=FORMATS, default="voc", help="dataset format"
+    )
+    parser.add_argument(
+        "--noviz", help="no visualization", action="store_true"
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes",
+    )
+    parser.add_argument(
+        "--update",
+        "--resume",
+        dest="update",
+        action="store_true",
+        help="update an existing (or interrupted) export in output_dir, "
+        "converting only new and changed files",
+    )
+    args = parser.parse_args()
+
+    if args.format == "coco" and pycocotools is None:
+        logger.error(
+            "Please install pycocotools:\n\n    pip install pycocotools\n"
+        )
+        sys.exit(1)
+
+    if osp.exists(args.output_dir) and not args.update:
+        logger.error(
+            "Output directory already exists: {}".format(args.output_dir)
+        )
+        sys.exit(1)
+
+    class_names, class_name_to_id = load_labels(args.labels)
+
+    export_dir = osp.join(args.output_dir, EXPORT_DIR)
+    options_file = osp.join(export_dir, "options.json")
+    options = dict(
+        format=args.format,
+        noviz=args.noviz,
+        labels=sorted(class_name_to_id.items(), key=lambda x: x[1]),
+    )
+    options = json.loads(json.dumps(options))  # tuples to lists
+    if osp.exists(options_file):
+        with open(options_file) as f:
+            if json.load(f) != options:
+                logger.error(
+                    "Output directory was exported with different format, "
+                    "labels or --noviz: {}".format(args.output_dir)
+                )
+                sys.exit(1)
+
+    out_dirs = get_output_dirs(args.format, args.noviz)
+    out_dirs += [EXPORT_DIR, osp.join(EXPORT_DIR, "fragments")]
+    for out_dir in out_dirs:
+        out_dir = osp.join(args.output_dir, out_dir)
+        if not osp.exists(out_dir):
+            os.makedirs(out_dir)
+    with open(options_file, "w") as f:
+        json.dump(options, f)
+    logger.info("Creating dataset: {}".format(args.output_dir))
+
+    if args.format == "coco":
+        func = functools.partial(
+            export_coco,
+            output_dir=args.output_dir,
+            class_name_to_id={
+                name: class_id
+                for name, class_id in class_name_to_id.items()
+                if class_id != -1
+            },
+        )
+    else:
+        assert class_names[0] == "_background_"
+        with open(osp.join(args.output_dir, "class_names.txt"), "w") as f:
+            f.writelines("\n".join(class_names))
+        func = functools.partial(
+            export_voc,
+            output_dir=args.output_dir,
+            class_names=class_names,
+            class_name_to_id=class_name_to_id,
+            instance=args.format == "voc-instance",
+            noviz=args.noviz,
+        )
+    func = functools.partial(_export, func, export_dir)
+
+    # sorted, so the output does not depend on the file system or workers
+    label_files = get_unique_label_files(
+        filename
+        for suffix in LabelFile.suffixes
+        for filename in glob.glob(osp.join(args.input_dir, "*" + suffix))
+    )
+    names = set(osp.basename(f) for f in label_files)
+
+    manifest_file = osp.join(export_dir, "manifest.jsonl")
+    manifest = read_manifest(manifest_file)
+    deleted = [name for name in manifest if name not in names]
+    todo = [
+        f
+        for f in label_files
+        if not is_unchanged(f, manifest.get(osp.basename(f)))
+    ]
+    logger.info(
+        "Label files: {} new or changed, {} deleted, {} unchanged".format(
+            len(todo), len(deleted), len(label_files) - len(todo)
+        )
+    )
+
+    with open(manifest_file, "a") as f:
+        if f.tell() > 0:
+            f.write("\n")  # in case the last line was cut off
+
+        def remove_entry(name):
+            entry = manifest.pop(name)
+            remove_outputs(args.output_dir, entry["outputs"])
+            if "fragment" in entry:
+                remove_outputs(export_dir, [entry["fragment"]])
+            f.write(json.dumps(dict(filename=name, deleted=True)) + "\n")
+            f.flush()
+
+        for name in deleted:
+            remove_entry(name)
+            logger.info("Removed: {}".format(name))
+
+        if args.workers > 1:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=args.workers
+            )
+            exported = imap_ordered(
+                executor, func, todo, window=4 * args.workers
+            )
+        else:
+            executor = None
+            exported = map(func, todo)
+        try:
+            for filename, entry in zip(todo, exported):
+                if "error" in entry:
+                    logger.error(
+                        "Failed exporting {}: {}".format(
+                            filename, entry["error"]
+                        )
+                    )
+                    # the previous outputs are outdated and may be partly
+                    # overwritten, so they are removed and the file is
+                    # exported again by the next update
+                    if entry["filename"] in manifest:
+                        remove_entry(entry["filename"])
+                    remove_outputs(
+                        args.output_dir,
+                        find_outputs(
+                            args.output_dir,
+                            get_output_dirs(args.format, args.noviz),
+                            osp.splitext(entry["filename"])[0],
+                        ),
+                    )
+                    continue
+                logger.info("Exported: {}".format(filename))
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                old_entry = manifest.get(entry["filename"])
+                if old_entry is not None:
+                    remove_outputs(
+                        args.output_dir,
+                        set(old_entry["outputs"]) - set(entry["outputs"]),
+                    )
+                manifest[entry["filename"]] = entry
+        finally:
+            if executor is not None:
+                exported.close()
+                executor.shutdown()
+
+    write_manifest(manifest_file, manifest)
+
+    ann_file = osp.join(args.output_dir, "annotations.json")
+    if args.format == "coco" and (todo or deleted or not osp.exists(ann_file)):
+        entries = [
+            manifest[osp.basename(f)]
+            for f in label_files
+            if osp.basename(f) in manifest
+        ]
+        write_coco(
+            ann_file,
+            class_names=class_names,
+            class_name_to_id=class_name_to_id,
+            fragments=_iter_fragments(export_dir, entries),
+        )
+    logger.info("Saved to: {}".format(args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import argparse
+import base64
+import glob
+import io
+import os.path as osp
+
+from labelme.image_store import get_image_ref
+from labelme.label_file import dump_json
+from labelme.label_file import dump_npz
+from labelme.label_file import get_unique_label_files
+from labelme.label_file import LabelFile
+from labelme.label_file import load_npz
+from labelme.logger import logger
+from labelme import utils
+
+
+DEFAULT_STORE_DIR = ".labelme_images"
+
+
+def iter_label_files(paths):
+    for path in paths:
+        if osp.isdir(path):
+            for filename in get_unique_label_files(
+                filename
+                for suffix in LabelFile.suffixes
+                for filename in glob.glob(osp.join(path, "*" + suffix))
+            ):
+                yield filename
+        else:
+            yield path
+
+
+def _load(filename):
+    # imageData is raw bytes in a .npz label file, base64 in a JSON one
+    if LabelFile.is_npz_file(filename):
+        return load_npz(filename)
+    return utils.json_load(filename)
+
+
+def _dump(filename, data):
+    if LabelFile.is_npz_file(filename):
+        dump_npz(filename, data)
+    else:
+        dump_json(filename, data)
+
+
+def extract_image(filename, store_dir):
+    """Move the embedded image of a label file to the image store.
+
+    Return False if the label file has no embedded image.
+    """
+    data = _load(filename)
+    if data.get("imageData") is None:
+        return False
+    imageData = data["imageData"]
+    if not LabelFile.is_npz_file(filename):
+        imageData = base64.b64decode(imageData)
+    data["imageData"] = None
+    data["imageRef"] = get_image_ref(filename, store_dir, imageData)
+    _dump(filename, data)
+    return True
+
+
+def embed_image(filename):
+    """Embed the image a label file refers to in the image store.
+
+    Return False if the label file does not refer to the image store.
+    """
+    data = _load(filename)
+    if not data.get("imageRef"):
+        return False
+    imageRef = osp.join(osp.dirname(filename), data.pop("imageRef"))
+    with io.open(imageRef, "rb") as f:
+        imageData = f.read()
+    if not LabelFile.is_npz_file(filename):
+        imageData = base64.b64encode(imageData).decode("utf-8")
+    data["imageData"] = imageData
+    _dump(filename, data)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Move the image data of label files to a content "
+        "addressed image store, or back into the label files.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "command",
+        choices=["extract", "embed"],
+        help="extract: move embedded images to the store, "
+        "embed: move images from the store into the label files",
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="label files or directories of them"
+    )
+    parser.add_argument(
+        "--store",
+        default=DEFAULT_STORE_DIR,
+        help="store directory, relative to each label file (extract only)",
+    )
+    args = parser.parse_args()
+
+    num_changed = 0
+    num_files = 0
+    for filename in iter_label_files(args.paths):
+        num_files += 1
+        if args.command == "extract":
+            changed = extract_image(filename, args.store)
+        else:
+            changed = embed_image(filename)
+        if changed:
+            num_changed += 1
+            logger.info("Converted: {}".format(filename))
+    logger.info("Converted {} of {} files".format(num_changed, num_files))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import time
+
+from labelme.label_index import LabelIndex
+from labelme.logger import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or refresh the SQLite index of the shapes in "
+        "a directory of label files, and query it.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("input_dir", help="input annotated directory")
+    parser.add_argument(
+        "--db",
+        help="database file (default: .labelme_index.sqlite in input_dir)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print the number of shapes and files per label",
+    )
+    parser.add_argument(
+        "--find", metavar="LABEL", help="print the files with label"
+    )
+    args = parser.parse_args()
+
+    with LabelIndex(args.input_dir, db_file=args.db) as index:
+        t_start = time.time()
+        num_updated, num_removed = index.update()
+        logger.info(
+            "Indexed {} files and removed {} in {:.2f} s".format(
+                num_updated, num_removed, time.time() - t_start
+            )
+        )
+
+        if args.stats:
+            print("{:<30} {:>10} {:>10}".format("label", "shapes", "files"))
+            for label, num_shapes, num_files in index.count_labels():
+                print(
+                    "{:<30} {:>10} {:>10}".format(label, num_shapes, num_files)
+                )
+        if args.find is not None:
+            for filename in index.find_files(args.find):
+                print(filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,10 @@ def validate_config_item(key, value):
         raise ValueError(
             "Unexpected value for config key 'shape_color': {}".format(value)
         )
+    if key == "json_backend" and value not in ["json", "orjson"]:
+        raise ValueError(
+            "Unexpected value for config key 'json_backend': {}".format(value)
+        )
     if key == "labels" and value is not None and len(value) != len(set(value)):
         raise ValueError(
             "Duplicates are detected for config key 'labels': {}".format(value)
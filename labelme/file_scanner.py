@@ -0,0 +1,169 @@
+import collections
+import os
+import os.path as osp
+import threading
+import time
+
+from qtpy import QtCore
+
+from labelme.label_file import LabelFile
+from labelme.logger import logger
+
+
+def _list_dir(dirpath):
+    try:
+        return list(os.scandir(dirpath))
+    except OSError as e:
+        logger.warning("Failed listing directory {}: {}".format(dirpath, e))
+        return []
+
+
+def _get_label_names(entries):
+    suffixes = tuple(LabelFile.suffixes)
+    return set(
+        entry.name for entry in entries if entry.name.endswith(suffixes)
+    )
+
+
+def _is_labeled(name, label_names):
+    stem = osp.splitext(name)[0]
+    return any(stem + suffix in label_names for suffix in LabelFile.suffixes)
+
+
+def iter_image_files(dirpath, extensions, output_dir=None):
+    """Yield (filename, labeled) for the images under dirpath.
+
+    Files come in the order of sorting the paths case-insensitively, but
+    each directory is listed only when the walk reaches it. Whether an
+    image has a label file is looked up in the listing of its directory
+    (or output_dir) instead of a stat call per file.
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    output_label_names = None
+    if output_dir:
+        output_label_names = _get_label_names(_list_dir(output_dir))
+
+    def walk(path):
+        entries = _list_dir(path)
+        if output_label_names is None:
+            label_names = _get_label_names(entries)
+        else:
+            label_names = output_label_names
+
+        def sort_key(entry):
+            # a directory sorts like the paths inside of it
+            if entry.is_dir():
+                return (entry.name + "/").lower()
+            return entry.name.lower()
+
+        for entry in sorted(entries, key=sort_key):
+            if entry.is_dir():
+                if not entry.is_symlink():  # like os.walk
+                    for item in walk(entry.path):
+                        yield item
+            elif entry.name.lower().endswith(extensions):
+                yield entry.path, _is_labeled(entry.name, label_names)
+
+    return walk(dirpath)
+
+
+def get_labeled_files(filenames, output_dir=None):
+    """Return the set of filenames which have a label file.
+
+    Each directory (or output_dir) is listed once for all of its files.
+    """
+    if output_dir:
+        label_names = _get_label_names(_list_dir(output_dir))
+        return set(
+            filename
+            for filename in filenames
+            if _is_labeled(osp.basename(filename), label_names)
+        )
+
+    filenames_by_dir = collections.defaultdict(list)
+    for filename in filenames:
+        filenames_by_dir[osp.dirname(filename)].append(filename)
+    labeled = set()
+    for dirpath, files in filenames_by_dir.items():
+        label_names = _get_label_names(_list_dir(dirpath or "."))
+        labeled.update(
+            filename
+            for filename in files
+            if _is_labeled(osp.basename(filename), label_names)
+        )
+    return labeled
+
+
+class DirectoryScanner(QtCore.QObject):
+    """Scan a directory for images in a background thread.
+
+    Images are reported in chunks with filesFound(filenames, labeled) as
+    the scan goes, so that the file list can be filled incrementally.
+    """
+
+    filesFound = QtCore.Signal(list, list)
+    finished = QtCore.Signal()
+
+    _chunkReady = QtCore.Signal(int, list, list)
+    _scanFinished = QtCore.Signal(int)
+
+    def __init__(self, parent=None, chunk_size=1000, interval=0.1):
+        super(DirectoryScanner, self).__init__(parent)
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self._generation = 0
+        self._cancelled = threading.Event()
+        self._chunkReady.connect(self._onChunkReady)
+        self._scanFinished.connect(self._onScanFinished)
+
+    def scan(self, dirpath, extensions, output_dir=None):
+        self.cancel()
+        self._cancelled = threading.Event()
+        thread = threading.Thread(
+            target=self._scan,
+            args=(
+                self._generation,
+                self._cancelled,
+                dirpath,
+                extensions,
+                output_dir,
+            ),
+        )
+        thread.daemon = True
+        thread.start()
+
+    def cancel(self):
+        """Stop the current scan and drop the chunks still queued."""
+        self._cancelled.set()
+        self._generation += 1
+
+    def _scan(self, generation, cancelled, dirpath, extensions, output_dir):
+        filenames = []
+        labeled = []
+        last_emit = time.time()
+        for filename, is_labeled in iter_image_files(
+            dirpath, extensions, output_dir=output_dir
+        ):
+            if cancelled.is_set():
+                return
+            filenames.append(filename)
+            labeled.append(is_labeled)
+            if (
+                len(filenames) >= self.chunk_size
+                or time.time() - last_emit > self.interval
+            ):
+                self._chunkReady.emit(generation, filenames, labeled)
+                filenames = []
+                labeled = []
+                last_emit = time.time()
+        if filenames:
+            self._chunkReady.emit(generation, filenames, labeled)
+        self._scanFinished.emit(generation)
+
+    def _onChunkReady(self, generation, filenames, labeled):
+        if generation == self._generation:
+            self.filesFound.emit(filenames, labeled)
+
+    def _onScanFinished(self, generation):
+        if generation == self._generation:
+            self.finished.emit()
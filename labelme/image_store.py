@@ -0,0 +1,52 @@
+import hashlib
+import io
+import os
+import os.path as osp
+
+
+class ImageStore(object):
+    """Directory of image files named by the SHA-256 of their content.
+
+    The same image is stored only once however many label files refer to
+    it, and a file is never modified after it is written.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    @staticmethod
+    def get_key(imageData):
+        return hashlib.sha256(imageData).hexdigest()
+
+    def path(self, key):
+        return osp.join(self.root, key[:2], key)
+
+    def put(self, imageData):
+        """Store imageData if not stored yet and return its key."""
+        key = self.get_key(imageData)
+        filename = self.path(key)
+        if osp.exists(filename):
+            return key
+        if not osp.exists(osp.dirname(filename)):
+            os.makedirs(osp.dirname(filename))
+        tmp_filename = "{}.{}.tmp".format(filename, os.getpid())
+        with io.open(tmp_filename, "wb") as f:
+            f.write(imageData)
+        os.replace(tmp_filename, filename)
+        return key
+
+
+def get_image_ref(label_file, store_dir, imageData):
+    """Store imageData and return its path relative to label_file.
+
+    store_dir is relative to the directory of label_file, unless absolute.
+    """
+    dirname = osp.dirname(label_file)
+    store = ImageStore(osp.join(dirname, store_dir))
+    key = store.put(imageData)
+    return osp.relpath(store.path(key), dirname or ".")
+
+
+def get_store_dir(imageRef):
+    """Return the store directory of an image reference."""
+    return osp.dirname(osp.dirname(imageRef))
@@ -1,12 +1,14 @@
 import base64
-import contextlib
 import io
-import json
+import os
 import os.path as osp
 
+import numpy as np
 import PIL.Image
 
 from labelme import __version__
+from labelme.image_store import get_image_ref
+from labelme.image_store import get_store_dir
 from labelme.logger import logger
 from labelme import PY2
 from labelme import QT4
@@ -16,16 +18,104 @@ from labelme import utils
 PIL.Image.MAX_IMAGE_PIXELS = None
 
 
-@contextlib.contextmanager
-def open(name, mode):
-    assert mode in ["r", "w"]
-    if PY2:
-        mode += "b"
-        encoding = None
-    else:
-        encoding = "utf-8"
-    yield io.open(name, mode, encoding=encoding)
-    return
+def dump_json(filename, data, compact=False, backend=None):
+    """Write data as a label file.
+
+    It is written to a temporary file first which then replaces filename,
+    so that a label file is never left half written. The JSON is indented
+    unless compact, and is serialized by the JSON backend of utils.
+    """
+    tmp_filename = filename + ".tmp"
+    try:
+        with io.open(tmp_filename, "wb") as f:
+            f.write(utils.json_dumps(data, compact=compact, backend=backend))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filename, filename)
+    except Exception:
+        if osp.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+
+
+def dump_npz(filename, data):
+    """Write data as a label file in the NumPy .npz format.
+
+    The points of all the shapes are packed into a single (N, 2) array,
+    with the start of each shape in offsets, and the shape types and labels
+    are indices to the tables shape_type_names and label_names. imageData
+    is stored as raw bytes, not base64. Everything else is kept as JSON in
+    meta, with the remaining keys of each shape in meta["shapes"].
+    """
+    shapes = data["shapes"]
+    points = [p for s in shapes for p in s["points"]]
+    offsets = np.cumsum([0] + [len(s["points"]) for s in shapes])
+    shape_type_names = sorted(set(s["shape_type"] for s in shapes))
+    label_names = sorted(set(s["label"] for s in shapes))
+    shape_type_to_id = {name: i for i, name in enumerate(shape_type_names)}
+    label_to_id = {name: i for i, name in enumerate(label_names)}
+
+    meta = {k: v for k, v in data.items() if k not in ["shapes", "imageData"]}
+    meta["shapes"] = [
+        {
+            k: v
+            for k, v in s.items()
+            if k not in ["label", "points", "shape_type"]
+        }
+        for s in shapes
+    ]
+    arrays = dict(
+        points=np.array(points, dtype=np.float64).reshape(-1, 2),
+        offsets=offsets.astype(np.int64),
+        shape_types=np.array(
+            [shape_type_to_id[s["shape_type"]] for s in shapes],
+            dtype=np.int32,
+        ),
+        shape_type_names=np.array(shape_type_names, dtype=np.str_),
+        labels=np.array(
+            [label_to_id[s["label"]] for s in shapes], dtype=np.int32
+        ),
+        label_names=np.array(label_names, dtype=np.str_),
+        meta=np.array(utils.json_dumps(meta, compact=True).decode("utf-8")),
+    )
+    if data["imageData"] is not None:
+        arrays["imageData"] = np.frombuffer(data["imageData"], dtype=np.uint8)
+
+    tmp_filename = filename + ".tmp"
+    try:
+        with io.open(tmp_filename, "wb") as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filename, filename)
+    except Exception:
+        if osp.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+
+
+def load_npz(filename):
+    """Read a label file written by dump_npz() into the JSON layout.
+
+    Unlike in a JSON label file, imageData is raw bytes.
+    """
+    with np.load(filename, allow_pickle=False) as npz:
+        data = utils.json_loads(npz["meta"].item())
+        points = npz["points"].tolist()
+        offsets = npz["offsets"].tolist()
+        shape_type_names = npz["shape_type_names"].tolist()
+        label_names = npz["label_names"].tolist()
+        shape_types = npz["shape_types"].tolist()
+        labels = npz["labels"].tolist()
+        if "imageData" in npz.files:
+            data["imageData"] = npz["imageData"].tobytes()
+        else:
+            data["imageData"] = None
+    for i, shape in enumerate(data["shapes"]):
+        shape["label"] = label_names[labels[i]]
+        shape["points"] = points[offsets[i]:offsets[i + 1]]
+        shape["shape_type"] = shape_type_names[shape_types[i]]
+    return data
 
 
 class LabelFileError(Exception):
@@ -35,11 +125,13 @@ class LabelFileError(Exception):
 class LabelFile(object):
 
     suffix = ".json"
+    suffixes = [".json", ".npz"]
 
     def __init__(self, filename=None):
         self.shapes = []
         self.imagePath = None
         self.imageData = None
+        self.imageStore = None
         if filename is not None:
             self.load(filename)
         self.filename = filename
@@ -52,6 +144,18 @@ class LabelFile(object):
             logger.error("Failed opening image file: {}".format(filename))
             return
 
+        # PIL.Image.open only parses the header, so when no exif rotation is
+        # needed the original bytes can be returned without decoding the
+        # pixels and re-encoding them (which is also lossy for JPEG).
+        orientation = utils.get_exif_orientation(image_pil)
+        if (
+            not (PY2 and QT4)
+            and image_pil.format in ["JPEG", "PNG"]
+            and orientation in [None, 1]
+        ):
+            with io.open(filename, "rb") as f:
+                return f.read()
+
         # apply orientation to image according to exif
         image_pil = utils.apply_exif_orientation(image_pil)
 
@@ -71,6 +175,7 @@ class LabelFile(object):
         keys = [
             "version",
             "imageData",
+            "imageRef",
             "imagePath",
             "shapes",  # polygonal annotations
             "flags",  # image level flags
@@ -85,9 +190,12 @@ class LabelFile(object):
             "shape_type",
             "flags",
         ]
+        is_npz = self.is_npz_file(filename)
         try:
-            with open(filename, "r") as f:
-                data = json.load(f)
+            if is_npz:
+                data = load_npz(filename)
+            else:
+                data = utils.json_load(filename)
             version = data.get("version")
             if version is None:
                 logger.warn(
@@ -104,10 +212,20 @@ class LabelFile(object):
                     )
                 )
 
+            imageStore = None
             if data["imageData"] is not None:
-                imageData = base64.b64decode(data["imageData"])
+                if is_npz:
+                    imageData = data["imageData"]
+                else:
+                    imageData = base64.b64decode(data["imageData"])
                 if PY2 and QT4:
                     imageData = utils.img_data_to_png_data(imageData)
+            elif data.get("imageRef"):
+                # image saved in an ImageStore
+                imageStore = get_store_dir(data["imageRef"])
+                imageRef = osp.join(osp.dirname(filename), data["imageRef"])
+                with io.open(imageRef, "rb") as f:
+                    imageData = f.read()
             else:
                 # relative path from label file to relative path from cwd
                 imagePath = osp.join(osp.dirname(filename), data["imagePath"])
@@ -115,7 +233,7 @@ class LabelFile(object):
             flags = data.get("flags") or {}
             imagePath = data["imagePath"]
             self._check_image_height_and_width(
-                base64.b64encode(imageData).decode("utf-8"),
+                imageData,
                 data.get("imageHeight"),
                 data.get("imageWidth"),
             )
@@ -146,24 +264,26 @@ class LabelFile(object):
         self.shapes = shapes
         self.imagePath = imagePath
         self.imageData = imageData
+        self.imageStore = imageStore
         self.filename = filename
         self.otherData = otherData
 
     @staticmethod
     def _check_image_height_and_width(imageData, imageHeight, imageWidth):
-        img_arr = utils.img_b64_to_arr(imageData)
-        if imageHeight is not None and img_arr.shape[0] != imageHeight:
+        # only the image header is parsed to get the size
+        width, height = utils.img_data_to_pil(imageData).size
+        if imageHeight is not None and height != imageHeight:
             logger.error(
                 "imageHeight does not match with imageData or imagePath, "
                 "so getting imageHeight from actual image."
             )
-            imageHeight = img_arr.shape[0]
-        if imageWidth is not None and img_arr.shape[1] != imageWidth:
+            imageHeight = height
+        if imageWidth is not None and width != imageWidth:
             logger.error(
                 "imageWidth does not match with imageData or imagePath, "
                 "so getting imageWidth from actual image."
             )
-            imageWidth = img_arr.shape[1]
+            imageWidth = width
         return imageHeight, imageWidth
 
     def save(
@@ -176,12 +296,32 @@ class LabelFile(object):
         imageData=None,
         otherData=None,
         flags=None,
+        imageStore=None,
+        compact=False,
+        jsonBackend=None,
     ):
+        """Save the label file.
+
+        If imageStore is given, imageData is saved in the ImageStore at
+        that directory (relative to the label file) and the label file
+        refers to it with imageRef instead of embedding it. If compact, a
+        JSON label file is written without indentation. jsonBackend is a
+        key of utils.JSON_BACKENDS, the stdlib json by default.
+        """
+        imageRef = None
         if imageData is not None:
-            imageData = base64.b64encode(imageData).decode("utf-8")
             imageHeight, imageWidth = self._check_image_height_and_width(
                 imageData, imageHeight, imageWidth
             )
+            if imageStore is None:
+                if not self.is_npz_file(filename):
+                    imageData = base64.b64encode(imageData).decode("utf-8")
+            else:
+                try:
+                    imageRef = get_image_ref(filename, imageStore, imageData)
+                except Exception as e:
+                    raise LabelFileError(e)
+                imageData = None
         if otherData is None:
             otherData = {}
         if flags is None:
@@ -195,16 +335,51 @@ class LabelFile(object):
             imageHeight=imageHeight,
             imageWidth=imageWidth,
         )
+        if imageRef is not None:
+            data["imageRef"] = imageRef
         for key, value in otherData.items():
             assert key not in data
             data[key] = value
         try:
-            with open(filename, "w") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            if self.is_npz_file(filename):
+                dump_npz(filename, data)
+            else:
+                dump_json(
+                    filename, data, compact=compact, backend=jsonBackend
+                )
             self.filename = filename
+            self.imageStore = imageStore if imageRef else None
         except Exception as e:
             raise LabelFileError(e)
 
     @staticmethod
     def is_label_file(filename):
-        return osp.splitext(filename)[1].lower() == LabelFile.suffix
+        return osp.splitext(filename)[1].lower() in LabelFile.suffixes
+
+    @staticmethod
+    def is_npz_file(filename):
+        return osp.splitext(filename)[1].lower() == ".npz"
+
+
+def get_unique_label_files(filenames):
+    """Return the label files in filenames with one per image, sorted.
+
+    If both a.json and a.npz exist, the one whose suffix comes first in
+    LabelFile.suffixes is used like in the app, and the other is skipped.
+    """
+    def get_rank(filename):
+        suffix = osp.splitext(filename)[1].lower()
+        return LabelFile.suffixes.index(suffix), filename
+
+    label_files = {}
+    for filename in sorted(filenames, key=get_rank):
+        stem = osp.splitext(filename)[0]
+        if stem in label_files:
+            logger.warning(
+                "Skipping {}, {} is used instead".format(
+                    filename, label_files[stem]
+                )
+            )
+            continue
+        label_files[stem] = filename
+    return sorted(label_files.values())
@@ -0,0 +1,239 @@
+import math
+import os
+import os.path as osp
+import sqlite3
+
+from labelme.label_file import get_unique_label_files
+from labelme.label_file import LabelFile
+from labelme.label_file import load_npz
+from labelme.logger import logger
+from labelme import utils
+
+
+DB_FILENAME = ".labelme_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    filename TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    image_path TEXT,
+    image_height INTEGER,
+    image_width INTEGER,
+    flags TEXT
+);
+CREATE TABLE IF NOT EXISTS shapes (
+    file_id INTEGER NOT NULL,
+    shape_id INTEGER NOT NULL,
+    label TEXT,
+    sub_label TEXT,
+    group_id INTEGER,
+    shape_type TEXT,
+    xmin REAL,
+    ymin REAL,
+    xmax REAL,
+    ymax REAL,
+    flags TEXT,
+    PRIMARY KEY (file_id, shape_id)
+);
+CREATE INDEX IF NOT EXISTS shapes_label ON shapes (label);
+CREATE TABLE IF NOT EXISTS failed_files (
+    filename TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def iter_label_files(root_dir):
+    """Yield the label files under root_dir, relative to it.
+
+    Hidden directories, like the image store, are skipped. Of a.json and
+    a.npz only the one the app loads is yielded.
+    """
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in get_unique_label_files(
+            f for f in filenames if LabelFile.is_label_file(f)
+        ):
+            yield osp.relpath(osp.join(dirpath, filename), root_dir)
+
+
+def get_bbox(points, shape_type):
+    """Return (xmin, ymin, xmax, ymax) of a shape."""
+    if not points:
+        return None, None, None, None
+    if shape_type == "circle" and len(points) == 2:
+        (cx, cy), (px, py) = points
+        r = math.hypot(cx - px, cy - py)
+        return cx - r, cy - r, cx + r, cy + r
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _dumps(obj):
+    return utils.json_dumps(obj, compact=True).decode("utf-8")
+
+
+def read_label_file(filename):
+    """Return the values of the files row and the shapes rows of a file.
+
+    The image is not needed, so LabelFile is not used to load it.
+    ValueError is raised if filename is not a label file.
+    """
+    if LabelFile.is_npz_file(filename):
+        data = load_npz(filename)
+    else:
+        data = utils.json_load(filename)
+    if not isinstance(data, dict) or not isinstance(
+        data.get("shapes"), list
+    ):
+        raise ValueError("not a label file")
+
+    file_row = (
+        data.get("imagePath"),
+        data.get("imageHeight"),
+        data.get("imageWidth"),
+        _dumps(data.get("flags") or {}),
+    )
+    shape_rows = []
+    for shape in data["shapes"]:
+        shape_type = shape.get("shape_type", "polygon")
+        shape_rows.append(
+            (
+                shape["label"],
+                shape.get("sub_label"),
+                shape.get("group_id"),
+                shape_type,
+            )
+            + tuple(get_bbox(shape["points"], shape_type))
+            + (_dumps(shape.get("flags") or {}),)
+        )
+    return file_row, shape_rows
+
+
+class LabelIndex(object):
+    """SQLite database of the shapes of all the label files in a directory.
+
+    update() parses only the label files whose mtime or size changed since
+    the last update, so that statistics and searches over a dataset do not
+    have to open every label file. The database has a row in the table
+    files for each label file, and a row in shapes for each of its shapes
+    with the label, sub_label, group_id, shape_type, bounding box and
+    flags. Files which cannot be read as label files, e.g. the COCO
+    annotations.json, are in failed_files until they change. Custom
+    queries can be run on connection.
+    """
+
+    def __init__(self, root_dir, db_file=None):
+        self.root_dir = root_dir
+        if db_file is None:
+            db_file = osp.join(root_dir, DB_FILENAME)
+        self.connection = sqlite3.connect(db_file)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def update(self):
+        """Index new and changed label files and drop deleted ones.
+
+        Return the numbers of files indexed and removed.
+        """
+        cursor = self.connection.cursor()
+        indexed = {
+            filename: (file_id, mtime, size)
+            for file_id, filename, mtime, size in cursor.execute(
+                "SELECT id, filename, mtime, size FROM files"
+            )
+        }
+        failed = {
+            filename: (mtime, size)
+            for filename, mtime, size in cursor.execute(
+                "SELECT filename, mtime, size FROM failed_files"
+            )
+        }
+        num_updated = 0
+        with self.connection:
+            for filename in iter_label_files(self.root_dir):
+                stat = os.stat(osp.join(self.root_dir, filename))
+                file_id, mtime, size = indexed.pop(filename, (None,) * 3)
+                if (mtime, size) == (stat.st_mtime, stat.st_size):
+                    continue
+                if failed.pop(filename, None) == (stat.st_mtime, stat.st_size):
+                    continue
+                if file_id is not None:
+                    self._remove(cursor, file_id)
+                # parsed before anything is inserted, so that a file which
+                # is not a label file leaves no rows in files and shapes
+                try:
+                    file_row, shape_rows = read_label_file(
+                        osp.join(self.root_dir, filename)
+                    )
+                except Exception as e:
+                    logger.warning(
+                        "Failed indexing {}: {}".format(filename, e)
+                    )
+                    cursor.execute(
+                        "INSERT OR REPLACE INTO failed_files VALUES (?, ?, ?)",
+                        (filename, stat.st_mtime, stat.st_size),
+                    )
+                    continue
+                cursor.execute(
+                    "DELETE FROM failed_files WHERE filename = ?", (filename,)
+                )
+                self._add(cursor, filename, stat, file_row, shape_rows)
+                num_updated += 1
+            for file_id, _, _ in indexed.values():
+                self._remove(cursor, file_id)
+            cursor.executemany(
+                "DELETE FROM failed_files WHERE filename = ?",
+                [(filename,) for filename in failed],
+            )
+        return num_updated, len(indexed)
+
+    @staticmethod
+    def _remove(cursor, file_id):
+        cursor.execute("DELETE FROM shapes WHERE file_id = ?", (file_id,))
+        cursor.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    @staticmethod
+    def _add(cursor, filename, stat, file_row, shape_rows):
+        cursor.execute(
+            "INSERT INTO files (filename, mtime, size, image_path, "
+            "image_height, image_width, flags) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (filename, stat.st_mtime, stat.st_size) + file_row,
+        )
+        file_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO shapes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (file_id, shape_id) + row
+                for shape_id, row in enumerate(shape_rows)
+            ],
+        )
+
+    def count_labels(self):
+        """Return (label, number of shapes, number of files) per label."""
+        return self.connection.execute(
+            "SELECT label, COUNT(*), COUNT(DISTINCT file_id) FROM shapes "
+            "GROUP BY label ORDER BY label"
+        ).fetchall()
+
+    def find_files(self, label):
+        """Return the label files which have a shape with label."""
+        rows = self.connection.execute(
+            "SELECT DISTINCT filename FROM files "
+            "JOIN shapes ON files.id = shapes.file_id "
+            "WHERE shapes.label = ? ORDER BY filename",
+            (label,),
+        )
+        return [osp.join(self.root_dir, filename) for (filename,) in rows]
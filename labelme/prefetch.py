@@ -0,0 +1,165 @@
+import collections
+import concurrent.futures
+import functools
+import os.path as osp
+import threading
+
+from qtpy import QtGui
+
+from labelme.label_file import LabelFile
+from labelme.logger import logger
+
+
+class Page(object):
+    """Decoded image and label data of a single entry of the file list."""
+
+    def __init__(
+        self,
+        filename,
+        label_file,
+        labelFile,
+        imagePath,
+        imageData,
+        image,
+    ):
+        self.filename = filename
+        self.label_file = label_file
+        self.labelFile = labelFile
+        self.imagePath = imagePath
+        self.imageData = imageData
+        self.image = image
+
+    @property
+    def nbytes(self):
+        nbytes = len(self.imageData or b"")
+        if not self.image.isNull():
+            nbytes += self.image.bytesPerLine() * self.image.height()
+        return nbytes
+
+
+def load_page(filename, label_file):
+    """Load an image (or its label file) the same way MainWindow does.
+
+    It only uses objects which are safe to create outside of the GUI thread,
+    and raises LabelFileError if the label file cannot be loaded.
+    """
+    if osp.exists(label_file) and LabelFile.is_label_file(label_file):
+        labelFile = LabelFile(label_file)
+        imageData = labelFile.imageData
+        imagePath = osp.join(osp.dirname(label_file), labelFile.imagePath)
+    else:
+        labelFile = None
+        imageData = LabelFile.load_image_file(filename)
+        imagePath = filename if imageData else None
+
+    if imageData:
+        image = QtGui.QImage.fromData(imageData)
+    else:
+        image = QtGui.QImage()
+
+    return Page(
+        filename=filename,
+        label_file=label_file,
+        labelFile=labelFile,
+        imagePath=imagePath,
+        imageData=imageData,
+        image=image,
+    )
+
+
+class PagePrefetcher(object):
+    """Load pages in worker threads and keep them in a bounded LRU cache."""
+
+    def __init__(self, max_workers=2, max_bytes=512 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers
+        )
+        self._lock = threading.Lock()
+        self._cache = collections.OrderedDict()  # key -> Page
+        self._futures = {}  # key -> Future
+        self._nbytes = 0
+
+    def prefetch(self, filename, label_file):
+        key = (filename, label_file)
+        with self._lock:
+            if key in self._cache or key in self._futures:
+                return
+            future = self._executor.submit(load_page, filename, label_file)
+            self._futures[key] = future
+        future.add_done_callback(functools.partial(self._onDone, key))
+
+    def _onDone(self, key, future):
+        with self._lock:
+            if self._futures.get(key) is not future:
+                return  # invalidated while loading
+            del self._futures[key]
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                logger.debug(
+                    "Failed prefetching {}: {}".format(
+                        key[0], future.exception()
+                    )
+                )
+                return
+            self._put(key, future.result())
+
+    def _put(self, key, page):
+        if key in self._cache:
+            self._nbytes -= self._cache.pop(key).nbytes
+        self._cache[key] = page
+        self._nbytes += page.nbytes
+        while self._nbytes > self.max_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    def get(self, filename, label_file):
+        """Return the prefetched page, waiting for it if still loading.
+
+        None is returned if the page was not requested or failed to load.
+        """
+        key = (filename, label_file)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            future = self._futures.get(key)
+        if future is None:
+            return None
+        try:
+            page = future.result()
+        except Exception:
+            return None
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+                self._put(key, page)
+        return page
+
+    def invalidate(self, label_file):
+        with self._lock:
+            for key in list(self._cache):
+                if key[1] == label_file:
+                    self._nbytes -= self._cache.pop(key).nbytes
+            futures = [
+                self._futures.pop(key)
+                for key in list(self._futures)
+                if key[1] == label_file
+            ]
+        # cancel() runs the done callbacks, so it must be called unlocked
+        for future in futures:
+            future.cancel()
+
+    def clear(self):
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+            self._cache.clear()
+            self._nbytes = 0
+        for future in futures:
+            future.cancel()
+
+    def shutdown(self):
+        self.clear()
+        self._executor.shutdown(wait=False)
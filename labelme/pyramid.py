@@ -0,0 +1,265 @@
+import collections
+import concurrent.futures
+import hashlib
+import math
+import os
+import os.path as osp
+import shutil
+import tempfile
+import threading
+
+from qtpy import QtCore
+from qtpy import QtGui
+
+from labelme.logger import logger
+
+
+def get_default_cache_dir():
+    return osp.join(tempfile.gettempdir(), "labelme-tiles")
+
+
+def _get_dir_size(path):
+    return sum(
+        entry.stat().st_size for entry in os.scandir(path) if entry.is_file()
+    )
+
+
+def prune_cache_dir(cache_dir, max_bytes, keep=None):
+    """Remove the least recently used images of cache_dir over max_bytes.
+
+    The tiles of each image are in a directory whose mtime is updated when
+    the image is used. keep is the directory of the current image, which
+    is never removed.
+    """
+    entries = []
+    total_bytes = 0
+    for entry in os.scandir(cache_dir):
+        if not entry.is_dir():
+            continue
+        nbytes = _get_dir_size(entry.path)
+        total_bytes += nbytes
+        if entry.name != keep:
+            entries.append((entry.stat().st_mtime, nbytes, entry.path))
+    for _, nbytes, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total_bytes -= nbytes
+
+
+class ImagePyramid(QtCore.QObject):
+    """Downscaled tiles of a large image for drawing it zoomed out.
+
+    Level k is the image downscaled by 2**k (k >= 1). Tiles are built on
+    request in a background thread, kept in a bounded in-memory cache and
+    optionally on disk, where they are keyed by the image content. The
+    disk cache is pruned to cache_size bytes, least recently used images
+    first.
+    """
+
+    tileReady = QtCore.Signal()
+
+    def __init__(
+        self,
+        image,
+        tile_size=512,
+        cache_dir=None,
+        cache_size=1024 ** 3,
+        max_tiles=256,
+        parent=None,
+    ):
+        super(ImagePyramid, self).__init__(parent)
+        self.image = image
+        self.tile_size = tile_size
+        self.cache_dir = cache_dir
+        self.max_tiles = max_tiles
+        self.max_level = max(
+            0,
+            int(math.log2(max(image.width(), image.height()) / tile_size)),
+        )
+
+        self._key = None
+        self._lock = threading.Lock()
+        self._images = {}  # tile -> QImage built by the worker
+        self._pixmaps = collections.OrderedDict()  # tile -> QPixmap (LRU)
+        self._futures = {}  # tile -> Future
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        if self.cache_dir:
+            self._executor.submit(self._pruneCache, cache_size)
+
+    def levelForScale(self, scale):
+        """Return the coarsest level which is still sharp at the scale."""
+        if scale >= 0.5:
+            return 0
+        return min(int(math.floor(math.log2(1.0 / scale))), self.max_level)
+
+    def draw(self, painter, rect, scale, fallback=None):
+        """Draw the part of the image inside rect (in image coordinates).
+
+        Tiles which are not ready yet are requested and drawn from a coarser
+        tile in memory if there is one, otherwise from fallback. Returns
+        False if scale does not need a downscaled level.
+        """
+        level = self.levelForScale(scale)
+        if level == 0:
+            return False
+
+        factor = 2 ** level
+        size = self.tile_size * factor  # tile size in image coordinates
+        col1 = int(rect.left() // size)
+        row1 = int(rect.top() // size)
+        col2 = int(rect.right() // size)
+        row2 = int(rect.bottom() // size)
+        for row in range(max(0, row1), row2 + 1):
+            for col in range(max(0, col1), col2 + 1):
+                source = QtCore.QRect(col * size, row * size, size, size)
+                source = source.intersected(self.image.rect())
+                if source.isEmpty():
+                    continue
+                pixmap = self._getPixmap((level, col, row))
+                if pixmap is not None:
+                    painter.drawPixmap(
+                        QtCore.QRectF(source),
+                        pixmap,
+                        QtCore.QRectF(pixmap.rect()),
+                    )
+                elif not self._drawCoarser(painter, source, level):
+                    if fallback is not None:
+                        painter.drawPixmap(source, fallback, source)
+        return True
+
+    def _drawCoarser(self, painter, source, level):
+        # scaling down the full image is what the pyramid is for, so a
+        # blurry coarser tile is preferred while the tile is being built
+        for coarse_level in range(level + 1, self.max_level + 1):
+            size = self.tile_size * 2 ** coarse_level
+            tile = (
+                coarse_level,
+                source.left() // size,
+                source.top() // size,
+            )
+            pixmap = self._pixmaps.get(tile)
+            if pixmap is None:
+                continue
+            factor = 2.0 ** coarse_level
+            painter.drawPixmap(
+                QtCore.QRectF(source),
+                pixmap,
+                QtCore.QRectF(
+                    (source.left() - tile[1] * size) / factor,
+                    (source.top() - tile[2] * size) / factor,
+                    source.width() / factor,
+                    source.height() / factor,
+                ),
+            )
+            return True
+        return False
+
+    def close(self):
+        try:
+            self.tileReady.disconnect()
+        except (RuntimeError, TypeError):
+            pass  # not connected
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _getPixmap(self, tile):
+        if tile in self._pixmaps:
+            self._pixmaps.move_to_end(tile)
+            return self._pixmaps[tile]
+        with self._lock:
+            image = self._images.pop(tile, None)
+            if image is None:
+                if tile not in self._futures:
+                    self._futures[tile] = self._executor.submit(
+                        self._buildTile, tile
+                    )
+                return None
+        # QPixmap can only be created in the GUI thread
+        pixmap = QtGui.QPixmap.fromImage(image)
+        self._pixmaps[tile] = pixmap
+        while len(self._pixmaps) > self.max_tiles:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+    def _getKey(self):
+        if self._key is None:
+            bits = self.image.constBits()
+            bits.setsize(self.image.bytesPerLine() * self.image.height())
+            self._key = "{}_{}x{}".format(
+                hashlib.sha1(bits).hexdigest(),
+                self.image.width(),
+                self.image.height(),
+            )
+        return self._key
+
+    def _pruneCache(self, cache_size):
+        key = self._getKey()
+        try:
+            if osp.isdir(osp.join(self.cache_dir, key)):
+                os.utime(osp.join(self.cache_dir, key))  # recently used
+            if osp.isdir(self.cache_dir):
+                prune_cache_dir(self.cache_dir, cache_size, keep=key)
+        except OSError as e:
+            logger.warning(
+                "Failed pruning image tile cache {}: {}".format(
+                    self.cache_dir, e
+                )
+            )
+
+    def _buildTile(self, tile):
+        try:
+            image = self._loadTile(tile)
+        except Exception as e:
+            logger.error("Failed building image tile {}: {}".format(tile, e))
+            image = None
+        with self._lock:
+            self._futures.pop(tile, None)
+            if image is not None:
+                self._images[tile] = image
+        if image is not None:
+            self.tileReady.emit()
+
+    def _loadTile(self, tile):
+        level, col, row = tile
+        cache_file = None
+        if self.cache_dir:
+            cache_file = osp.join(
+                self.cache_dir,
+                self._getKey(),
+                "{}_{}_{}.png".format(level, col, row),
+            )
+            if osp.exists(cache_file):
+                image = QtGui.QImage(cache_file)
+                if not image.isNull():
+                    return image
+
+        factor = 2 ** level
+        size = self.tile_size * factor
+        source = QtCore.QRect(col * size, row * size, size, size)
+        source = source.intersected(self.image.rect())
+        image = self.image.copy(source).scaled(
+            max(1, int(math.ceil(source.width() / factor))),
+            max(1, int(math.ceil(source.height() / factor))),
+            QtCore.Qt.IgnoreAspectRatio,
+            QtCore.Qt.SmoothTransformation,
+        )
+
+        if cache_file is not None:
+            try:
+                os.makedirs(osp.dirname(cache_file), exist_ok=True)
+                # write then rename so readers never see a partial file
+                tmp_file = "{}.{}.tmp".format(
+                    cache_file, threading.get_ident()
+                )
+                if image.save(tmp_file, "PNG"):
+                    os.replace(tmp_file, cache_file)
+            except OSError as e:
+                logger.warning(
+                    "Failed caching image tile {}: {}".format(cache_file, e)
+                )
+        return image
@@ -8,10 +8,6 @@ from qtpy.QtCore import QPointF
 import labelme.utils
 
 
-# TODO(unknown):
-# - [opt] Store paths instead of creating new ones at each paint.
-
-
 DEFAULT_LINE_COLOR = QtGui.QColor(0, 255, 0, 128)  # bf hovering
 DEFAULT_FILL_COLOR = QtGui.QColor(0, 255, 0, 128)  # hovering
 DEFAULT_SELECT_LINE_COLOR = QtGui.QColor(255, 153, 0)  # selected
@@ -93,35 +89,72 @@ class Shape(object):
         ]:
             raise ValueError("Unexpected shape_type: {}".format(value))
         self._shape_type = value
+        self._clearCache()
+
+    @property
+    def points(self):
+        return self._points
+
+    @points.setter
+    def points(self, value):
+        self._points = value
+        self._clearCache()
+
+    def _clearCache(self):
+        # Paths are cached until the points change, the vertex path also
+        # depends on the scale and the highlighted vertex.
+        self._path = None
+        self._bounding_rect = None
+        self._line_path = None
+        self._vertex_path = None
+        self._vertex_path_key = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in [
+            "_path",
+            "_bounding_rect",
+            "_line_path",
+            "_vertex_path",
+            "_vertex_path_key",
+        ]:
+            state[key] = None
+        return state
 
     def close(self):
         self._closed = True
+        self._line_path = None
 
     def addPoint(self, point):
         if self.points and point == self.points[0]:
             self.close()
         else:
             self.points.append(point)
+            self._clearCache()
 
     def canAddPoint(self):
         return self.shape_type in ["polygon", "linestrip"]
 
     def popPoint(self):
         if self.points:
+            self._clearCache()
             return self.points.pop()
         return None
 
     def insertPoint(self, i, point):
         self.points.insert(i, point)
+        self._clearCache()
 
     def removePoint(self, i):
         self.points.pop(i)
+        self._clearCache()
 
     def isClosed(self):
         return self._closed
 
     def setOpen(self):
         self._closed = False
+        self._line_path = None
 
     def getRectFromLine(self, pt1, pt2):
         x1, y1 = pt1.x(), pt1.y()
@@ -138,44 +171,16 @@ class Shape(object):
             pen.setWidth(max(1, int(round(2.0 / self.scale))))
             painter.setPen(pen)
 
-            line_path = QtGui.QPainterPath()
-            vrtx_path = QtGui.QPainterPath()
-
-            if self.shape_type == "rectangle" or self.shape_type == "cc_rectangle" or self.shape_type == "merge_rectangle":
-                assert len(self.points) in [1, 2]
-                if len(self.points) == 2:
-                    rectangle = self.getRectFromLine(*self.points)
-                    line_path.addRect(rectangle)
-                for i in range(len(self.points)):
-                    self.drawVertex(vrtx_path, i)
-            elif self.shape_type == "circle":
-                assert len(self.points) in [1, 2]
-                if len(self.points) == 2:
-                    rectangle = self.getCircleRectFromLine(self.points)
-                    line_path.addEllipse(rectangle)
-                for i in range(len(self.points)):
-                    self.drawVertex(vrtx_path, i)
-            elif self.shape_type == "linestrip":
-                line_path.moveTo(self.points[0])
-                for i, p in enumerate(self.points):
-                    line_path.lineTo(p)
-                    self.drawVertex(vrtx_path, i)
-            else:
-                line_path.moveTo(self.points[0])
-                # Uncommenting the following line will draw 2 paths
-                # for the 1st vertex, and make it non-filled, which
-                # may be desirable.
-                # self.drawVertex(vrtx_path, 0)
-
-                for i, p in enumerate(self.points):
-                    line_path.lineTo(p)
-                    self.drawVertex(vrtx_path, i)
-                if self.isClosed():
-                    line_path.lineTo(self.points[0])
+            line_path = self.makeLinePath()
+            vrtx_path = self.makeVertexPath()
 
             painter.drawPath(line_path)
             painter.drawPath(vrtx_path)
-            painter.fillPath(vrtx_path, self._vertex_fill_color)
+            if self._highlightIndex is not None:
+                vertex_fill_color = self.hvertex_fill_color
+            else:
+                vertex_fill_color = self.vertex_fill_color
+            painter.fillPath(vrtx_path, vertex_fill_color)
             if self.fill:
                 color = (
                     self.select_fill_color
@@ -184,6 +189,54 @@ class Shape(object):
                 )
                 painter.fillPath(line_path, color)
 
+    def makeLinePath(self):
+        """Return the outline drawn by paint (cached)."""
+        if self._line_path is not None:
+            return self._line_path
+
+        line_path = QtGui.QPainterPath()
+        if self.shape_type in ["rectangle", "cc_rectangle", "merge_rectangle"]:
+            assert len(self.points) in [1, 2]
+            if len(self.points) == 2:
+                rectangle = self.getRectFromLine(*self.points)
+                line_path.addRect(rectangle)
+        elif self.shape_type == "circle":
+            assert len(self.points) in [1, 2]
+            if len(self.points) == 2:
+                rectangle = self.getCircleRectFromLine(self.points)
+                line_path.addEllipse(rectangle)
+        elif self.shape_type == "linestrip":
+            line_path.moveTo(self.points[0])
+            for p in self.points:
+                line_path.lineTo(p)
+        else:
+            line_path.moveTo(self.points[0])
+            for p in self.points:
+                line_path.lineTo(p)
+            if self.isClosed():
+                line_path.lineTo(self.points[0])
+        self._line_path = line_path
+        return line_path
+
+    def makeVertexPath(self):
+        """Return the vertex markers drawn by paint (cached)."""
+        key = (
+            self.scale,
+            self.point_size,
+            self.point_type,
+            self._highlightIndex,
+            self._highlightMode,
+        )
+        if self._vertex_path is not None and self._vertex_path_key == key:
+            return self._vertex_path
+
+        vrtx_path = QtGui.QPainterPath()
+        for i in range(len(self.points)):
+            self.drawVertex(vrtx_path, i)
+        self._vertex_path = vrtx_path
+        self._vertex_path_key = key
+        return vrtx_path
+
     def drawVertex(self, path, i):
         d = self.point_size / self.scale
         shape = self.point_type
@@ -191,10 +244,6 @@ class Shape(object):
         if i == self._highlightIndex:
             size, shape = self._highlightSettings[self._highlightMode]
             d *= size
-        if self._highlightIndex is not None:
-            self._vertex_fill_color = self.hvertex_fill_color
-        else:
-            self._vertex_fill_color = self.vertex_fill_color
         if shape == self.P_SQUARE:
             path.addRect(point.x() - d / 2, point.y() - d / 2, d, d)
         elif shape == self.P_ROUND:
@@ -237,6 +286,9 @@ class Shape(object):
         return rectangle
 
     def makePath(self):
+        """Return the path used for hit-testing (cached)."""
+        if self._path is not None:
+            return self._path
         if self.shape_type == "rectangle" or self.shape_type == "cc_rectangle" or self.shape_type == "merge_rectangle":
             path = QtGui.QPainterPath()
             if len(self.points) == 2:
@@ -251,20 +303,23 @@ class Shape(object):
             path = QtGui.QPainterPath(self.points[0])
             for p in self.points[1:]:
                 path.lineTo(p)
+        self._path = path
         return path
 
     def boundingRect(self):
-        return self.makePath().boundingRect()
+        if self._bounding_rect is None:
+            self._bounding_rect = self.makePath().boundingRect()
+        return QtCore.QRectF(self._bounding_rect)
 
     def moveBy(self, offset):
         self.points = [p + offset for p in self.points]
 
     def moveVertexBy(self, i, offset):
         self.points[i] = self.points[i] + offset
+        self._clearCache()
     
     def moveAllVertexBy(self, offset):
-        for i in range(len(self.points)):
-            self.points[i] = self.points[i] + offset
+        self.moveBy(offset)
     
     def highlightVertex(self, i, action):
         self._highlightIndex = i
@@ -284,14 +339,27 @@ class Shape(object):
         self.select_line_color = QtGui.QColor(255, 153, 0)
         self.select_fill_color = QtGui.QColor(r, g, b, 155)
     
-    def isWhiteRect(self, np_image, offset_x=0, offset_y=0):
-        # self.points[0].y() < self.points[1].y()
-        for y in range(int(self.points[0].y()), int(self.points[1].y())):
-            # self.points[0].x() < self.points[1].x()
-            for x in range(int(self.points[0].x()), int(self.points[1].x())):
-                if np_image[y + offset_y][x + offset_x] == 0:
-                    return False
-        return True
+    def isWhiteRect(self, np_image, offset_x=0, offset_y=0, integral=None):
+        """Return True if the rectangle has no black (0) pixel.
+
+        integral is the summed-area table of the black pixels of np_image
+        (see utils.BinaryImageCache.integral), which makes the check O(1).
+        """
+        height, width = np_image.shape[:2]
+        # self.points[0] is the top left corner
+        x1 = min(max(int(self.points[0].x()) + offset_x, 0), width)
+        y1 = min(max(int(self.points[0].y()) + offset_y, 0), height)
+        x2 = min(max(int(self.points[1].x()) + offset_x, x1), width)
+        y2 = min(max(int(self.points[1].y()) + offset_y, y1), height)
+        if integral is None:
+            return not (np_image[y1:y2, x1:x2] == 0).any()
+        n_black = (
+            integral[y2, x2]
+            - integral[y1, x2]
+            - integral[y2, x1]
+            + integral[y1, x1]
+        )
+        return n_black == 0
 
     def distance(self, pos, eps):
         if self.shape_type == 'line':
@@ -314,4 +382,5 @@ class Shape(object):
 
     def __setitem__(self, key, value):
         self.points[key] = value
+        self._clearCache()
     
\ No newline at end of file
@@ -0,0 +1,164 @@
+import collections
+
+from qtpy import QtCore
+
+
+Delta = collections.namedtuple("Delta", ["changes", "order"])
+
+
+def _get_state(shape):
+    return dict(
+        points=[QtCore.QPointF(p) for p in shape.points],
+        closed=shape.isClosed(),
+        shape_type=shape.shape_type,
+        label=shape.label,
+        sub_label=shape.sub_label,
+        group_id=shape.group_id,
+        flags=dict(shape.flags) if shape.flags is not None else None,
+        other_data=dict(shape.other_data),
+    )
+
+
+def _set_state(shape, state):
+    shape.points = [QtCore.QPointF(p) for p in state["points"]]
+    if state["closed"]:
+        shape.close()
+    else:
+        shape.setOpen()
+    shape.shape_type = state["shape_type"]
+    shape.label = state["label"]
+    shape.sub_label = state["sub_label"]
+    shape.group_id = state["group_id"]
+    flags = state["flags"]
+    shape.flags = dict(flags) if flags is not None else None
+    shape.other_data = dict(state["other_data"])
+
+
+class ShapeHistory(object):
+    """Undo/redo history storing only the shapes changed by each edit.
+
+    Edits are reported with touch() (and touchOrder() when shapes are
+    added, removed or reordered) and recorded as one undo step by commit().
+    Each step keeps the before/after state of the touched shapes, plus the
+    shape order (references only) if it changed.
+    """
+
+    def __init__(self, limit=100):
+        self.limit = limit
+        self.clear()
+
+    def clear(self):
+        self._undoStack = []
+        self._redoStack = []
+        self._states = {}  # shape -> committed state
+        self._order = []  # committed shape order
+        self._pending = set()
+        self._orderChanged = False
+
+    def isEmpty(self):
+        return not (self._states or self._undoStack or self._redoStack)
+
+    def reset(self, shapes):
+        """Use shapes as the initial state, without an undo step."""
+        self.clear()
+        self._order = list(shapes)
+        for shape in shapes:
+            self._states[shape] = _get_state(shape)
+
+    def touch(self, shapes):
+        self._pending.update(shapes)
+
+    def touchOrder(self):
+        self._orderChanged = True
+
+    def canUndo(self):
+        return bool(self._undoStack)
+
+    def canRedo(self):
+        return bool(self._redoStack)
+
+    def commit(self, shapes):
+        """Record the pending edits as one undo step.
+
+        Returns True if anything changed since the last commit.
+        """
+        members = None
+        order = None
+        if self._orderChanged:
+            if list(shapes) != self._order:
+                order = (self._order, list(shapes))
+            members = set(shapes)
+
+        changes = []
+        for shape in self._pending:
+            before = self._states.get(shape)
+            if members is None:
+                exists = before is not None
+            else:
+                exists = shape in members
+            after = _get_state(shape) if exists else None
+            if before != after:
+                changes.append((shape, before, after))
+
+        self._pending = set()
+        self._orderChanged = False
+        if not changes and order is None:
+            return False
+
+        delta = Delta(changes=changes, order=order)
+        self._apply(delta, undo=False, restore=False)
+        self._undoStack.append(delta)
+        if len(self._undoStack) > self.limit:
+            del self._undoStack[0]
+        self._redoStack = []
+        return True
+
+    def discard(self):
+        """Forget the last undo step but keep the shapes as they are.
+
+        The shapes of the step become pending again, so the next commit
+        records them relative to the state before the discarded step.
+        """
+        if not self._undoStack:
+            return
+        delta = self._undoStack.pop()
+        self._apply(delta, undo=True, restore=False)
+        self._pending.update(shape for shape, _, _ in delta.changes)
+        if delta.order is not None:
+            self._orderChanged = True
+
+    def undo(self):
+        """Restore the shapes changed by the last step.
+
+        Returns the shape order to use (None if it did not change) and the
+        shapes whose state was restored.
+        """
+        if not self._undoStack:
+            return None, []
+        delta = self._undoStack.pop()
+        self._redoStack.append(delta)
+        return self._apply(delta, undo=True)
+
+    def redo(self):
+        if not self._redoStack:
+            return None, []
+        delta = self._redoStack.pop()
+        self._undoStack.append(delta)
+        return self._apply(delta, undo=False)
+
+    def _apply(self, delta, undo, restore=True):
+        self._pending = set()
+        self._orderChanged = False
+        for shape, before, after in delta.changes:
+            state = before if undo else after
+            if state is None:
+                self._states.pop(shape, None)
+                continue
+            if restore:
+                _set_state(shape, state)
+            self._states[shape] = state
+        shapes = [shape for shape, _, _ in delta.changes]
+        if delta.order is None:
+            return None, shapes
+        self._order = list(delta.order[0] if undo else delta.order[1])
+        return list(self._order), shapes
@@ -0,0 +1,90 @@
+import math
+
+
+class GridIndex(object):
+    """Uniform grid of axis-aligned bounding boxes.
+
+    Each item is stored in every cell its box overlaps, so a query only
+    looks at the items registered in the cells around the query box.
+    Boxes are given as (xmin, ymin, xmax, ymax).
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = float(cell_size)
+        self._cells = {}  # (col, row) -> set of items
+        self._boxes = {}  # item -> box
+        self._orders = {}  # item -> insertion order
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def __contains__(self, item):
+        return item in self._boxes
+
+    def _cellRange(self, box):
+        xmin, ymin, xmax, ymax = box
+        s = self.cell_size
+        return (
+            int(math.floor(xmin / s)),
+            int(math.floor(ymin / s)),
+            int(math.floor(xmax / s)),
+            int(math.floor(ymax / s)),
+        )
+
+    def _iterCells(self, box):
+        c1, r1, c2, r2 = self._cellRange(box)
+        for row in range(r1, r2 + 1):
+            for col in range(c1, c2 + 1):
+                yield col, row
+
+    def insert(self, item, box):
+        """Add an item (or move it if it is already indexed)."""
+        if item in self._boxes:
+            order = self._orders[item]
+            self.remove(item)
+        else:
+            order = self._counter
+            self._counter += 1
+        self._boxes[item] = box
+        self._orders[item] = order
+        for cell in self._iterCells(box):
+            self._cells.setdefault(cell, set()).add(item)
+
+    def remove(self, item):
+        box = self._boxes.pop(item, None)
+        if box is None:
+            return
+        del self._orders[item]
+        for cell in self._iterCells(box):
+            items = self._cells[cell]
+            items.discard(item)
+            if not items:
+                del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._boxes.clear()
+        self._orders.clear()
+        self._counter = 0
+
+    def query(self, box):
+        """Return items whose box overlaps with the given one.
+
+        Items are sorted by insertion order, so the last inserted one comes
+        last just like in the list the index was built from.
+        """
+        xmin, ymin, xmax, ymax = box
+        found = set()
+        for cell in self._iterCells(box):
+            found.update(self._cells.get(cell, ()))
+        items = []
+        for item in found:
+            ixmin, iymin, ixmax, iymax = self._boxes[item]
+            if ixmin > xmax or ixmax < xmin or iymin > ymax or iymax < ymin:
+                continue
+            items.append(item)
+        return sorted(items, key=self._orders.__getitem__)
+
+    def queryPoint(self, x, y, radius=0):
+        return self.query((x - radius, y - radius, x + radius, y + radius))
@@ -14,7 +14,9 @@ def assert_labelfile_sanity(filename):
     imageData = data.get("imageData", None)
     if imageData is None:
         parent_dir = osp.dirname(filename)
-        img_file = osp.join(parent_dir, data["imagePath"])
+        img_file = osp.join(
+            parent_dir, data.get("imageRef") or data["imagePath"]
+        )
         assert osp.exists(img_file)
         img = imgviz.io.imread(img_file)
     else:
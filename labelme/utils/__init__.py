@@ -2,7 +2,16 @@
 
 from ._io import lblsave
 
+from ._json import json_dumps
+from ._json import JSON_BACKENDS
+from ._json import json_load
+from ._json import json_loads
+
+from .coco import CocoWriter
+
 from .image import apply_exif_orientation
+from .image import BinaryImageCache
+from .image import get_exif_orientation
 from .image import img_arr_to_b64
 from .image import img_b64_to_arr
 from .image import img_data_to_arr
@@ -14,6 +23,7 @@ from .image import qimage_to_np_array
 from .shape import labelme_shapes_to_label
 from .shape import masks_to_bboxes
 from .shape import polygons_to_mask
+from .shape import shape_to_bbox_mask
 from .shape import shape_to_mask
 from .shape import shapes_to_label
 from .shape import merge_rectangle_inside_rectangle_with_same_label
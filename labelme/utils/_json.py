@@ -0,0 +1,74 @@
+import io
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _stdlib_loads(data):
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj, compact):
+    if compact:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(obj, ensure_ascii=False, indent=2)
+    return text.encode("utf-8")
+
+
+def _orjson_default(obj):
+    # e.g. numpy scalars, which the stdlib serializes as float or int
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError
+
+
+def _orjson_loads(data):
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # e.g. NaN or integers over 64 bits, which the stdlib accepts
+        return json.loads(data)
+
+
+def _orjson_dumps(obj, compact):
+    option = orjson.OPT_NON_STR_KEYS
+    if not compact:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=_orjson_default, option=option)
+
+
+JSON_BACKENDS = {"json": (_stdlib_loads, _stdlib_dumps)}
+if orjson is not None:
+    JSON_BACKENDS["orjson"] = (_orjson_loads, _orjson_dumps)
+
+# orjson parses to the same objects, but formats some floats differently
+# (e.g. 1e-7 instead of 1e-07) and writes NaN and Infinity as null, so it
+# writes files only if asked to, e.g. by the config key json_backend
+DEFAULT_JSON_LOADS_BACKEND = "orjson" if orjson is not None else "json"
+DEFAULT_JSON_DUMPS_BACKEND = "json"
+
+
+def json_loads(data, backend=None):
+    """Parse JSON from bytes or str."""
+    loads, _ = JSON_BACKENDS[backend or DEFAULT_JSON_LOADS_BACKEND]
+    return loads(data)
+
+
+def json_dumps(obj, compact=False, backend=None):
+    """Serialize obj to UTF-8 JSON bytes.
+
+    The output is indented by 2 spaces like json.dump(obj, indent=2,
+    ensure_ascii=False), or has no whitespace at all if compact. Only the
+    default "json" backend writes exactly the bytes of json.dumps.
+    """
+    _, dumps = JSON_BACKENDS[backend or DEFAULT_JSON_DUMPS_BACKEND]
+    return dumps(obj, compact)
+
+
+def json_load(filename, backend=None):
+    with io.open(filename, "rb") as f:
+        return json_loads(f.read(), backend=backend)
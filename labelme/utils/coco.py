@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import tempfile
+
+
+class CocoWriter(object):
+    """Write a COCO annotation file without keeping it in memory.
+
+    Images are written to the file when they are added, and annotations
+    are spooled to a temporary file until close(); only the categories are
+    kept in memory. The result is byte-identical to json.dump() of the
+    dict with keys info, licenses, images, type, annotations and
+    categories, in this order.
+
+    Used as a context manager, the file is finalized only if no exception
+    is raised; otherwise abort() removes the partial file.
+    """
+
+    def __init__(self, filename, info=None, licenses=(), type="instances"):
+        self.type = type
+        self.num_images = 0
+        self.num_annotations = 0
+        self._categories = []
+        self._filename = filename
+        self._file = open(filename, "w")
+        self._annotations = tempfile.TemporaryFile("w+")
+        self._file.write('{"info": ')
+        self._file.write(json.dumps(info))
+        self._file.write(', "licenses": ')
+        self._file.write(json.dumps(list(licenses)))
+        self._file.write(', "images": [')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @staticmethod
+    def _append(f, index, obj):
+        if index > 0:
+            f.write(", ")
+        f.write(json.dumps(obj))
+
+    def add_image(self, image):
+        self._append(self._file, self.num_images, image)
+        self.num_images += 1
+
+    def add_annotation(self, annotation):
+        self._append(self._annotations, self.num_annotations, annotation)
+        self.num_annotations += 1
+
+    def add_category(self, category):
+        self._categories.append(category)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.write('], "type": ')
+        self._file.write(json.dumps(self.type))
+        self._file.write(', "annotations": [')
+        self._annotations.seek(0)
+        shutil.copyfileobj(self._annotations, self._file)
+        self._annotations.close()
+        self._file.write('], "categories": ')
+        self._file.write(json.dumps(self._categories))
+        self._file.write("}")
+        self._file.close()
+
+    def abort(self):
+        """Close the file without finalizing it and remove it."""
+        if self._file.closed:
+            return
+        self._annotations.close()
+        self._file.close()
+        os.remove(self._filename)
@@ -58,14 +58,14 @@ def img_data_to_png_data(img_data):
             return f.read()
 
 
-def apply_exif_orientation(image):
+def get_exif_orientation(image):
     try:
         exif = image._getexif()
     except AttributeError:
         exif = None
 
     if exif is None:
-        return image
+        return None
 
     exif = {
         PIL.ExifTags.TAGS[k]: v
@@ -73,9 +73,15 @@ def apply_exif_orientation(image):
         if k in PIL.ExifTags.TAGS
     }
 
-    orientation = exif.get("Orientation", None)
+    return exif.get("Orientation", None)
+
 
-    if orientation == 1:
+def apply_exif_orientation(image):
+    orientation = get_exif_orientation(image)
+
+    if orientation is None:
+        return image
+    elif orientation == 1:
         # do nothing
         return image
     elif orientation == 2:
@@ -103,21 +109,53 @@ def apply_exif_orientation(image):
         return image
 
 def qimage_to_np_array(qimage):
-    incomingImage = qimage.convertToFormat(QtGui.QImage.Format.Format_RGB32)
-
-    width = incomingImage.width()
-    height = incomingImage.height()
-
-    ptr = incomingImage.constBits()
-    ptr.setsize(height * width * 4)
-    arr = np.array(ptr).reshape(height, width, 4)  #  Copies the data
-    
-    # 轉成binary image
-    arr = cv2.cvtColor(arr, cv2.COLOR_BGR2GRAY)
-    _, bmode = cv2.threshold(arr, 200, 255, cv2.THRESH_BINARY)
-    _, wmode = cv2.threshold(arr, 55, 255, cv2.THRESH_BINARY)
-    wmode = cv2.bitwise_not(wmode)
-    # cv2.imshow('aaa', arr)
-    return bmode, wmode
-    
-    
+    """Return the black mode and white mode (inverted) binary images."""
+    binary_images = BinaryImageCache(qimage)
+    return binary_images.get(200), binary_images.get(55, invert=True)
+
+
+class BinaryImageCache(object):
+    """Binarized versions of a QImage, computed on first use.
+
+    The grayscale image is read from the QImage bits without copying them,
+    and every (threshold, invert) result is kept for later calls.
+    """
+
+    def __init__(self, qimage):
+        self._qimage = qimage
+        self._gray = None
+        self._binary = {}
+        self._integral = {}
+
+    def gray(self):
+        if self._gray is None:
+            image = self._qimage.convertToFormat(QtGui.QImage.Format_RGB32)
+            width = image.width()
+            height = image.height()
+            ptr = image.constBits()
+            ptr.setsize(height * image.bytesPerLine())
+            arr = np.frombuffer(ptr, dtype=np.uint8).reshape(
+                height, image.bytesPerLine() // 4, 4
+            )[:, :width]
+            # 轉成binary image
+            self._gray = cv2.cvtColor(arr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    def get(self, threshold, invert=False):
+        key = (threshold, invert)
+        if key not in self._binary:
+            _, binary = cv2.threshold(
+                self.gray(), threshold, 255, cv2.THRESH_BINARY
+            )
+            if invert:
+                binary = cv2.bitwise_not(binary)
+            self._binary[key] = binary
+        return self._binary[key]
+
+    def integral(self, threshold, invert=False):
+        """Summed-area table counting the black pixels of get()."""
+        key = (threshold, invert)
+        if key not in self._integral:
+            black = (self.get(threshold, invert) == 0).astype(np.uint8)
+            self._integral[key] = cv2.integral(black, sdepth=cv2.CV_32S)
+        return self._integral[key]
@@ -9,37 +9,57 @@ here = os.path.dirname(os.path.abspath(__file__))
 # np_image  : input threshold image according to tool mode
 # rectangle : QPointF list
 # QPointF.x() / QPointF.y()
-# return (p1, p2, area)
+# return [(shape, area), ...]
 def connected_component_from_rectangle_region(np_image, rectangle):
-    # cv2.imshow(
-        # 'abs',
-        # np_image[
-            # int(rectangle[0].y()) : int(rectangle[1].y()),
-            # int(rectangle[0].x()) : int(rectangle[1].x())
-        # ]
-    # )
-    # print(rectangle[0], rectangle[1])
-    label = np.zeros(np_image.shape, np_image.dtype)
-    # set range of numpy array data
-    label[
-        min(int(rectangle[0].y()), int(rectangle[1].y())) : max(int(rectangle[0].y()), int(rectangle[1].y())),
-        min(int(rectangle[0].x()), int(rectangle[1].x())) : max(int(rectangle[0].x()), int(rectangle[1].x()))
-    ] = 255
-    
-    # 在qimage_to_np_array做了
-    # # to binary image
-    # _, thresImage = cv2.threshold(np_image, 150, 255, cv2.THRESH_BINARY)
-    label = cv2.bitwise_and(np_image, label)
+    height, width = np_image.shape[:2]
+    x1 = min(int(rectangle[0].x()), int(rectangle[1].x()))
+    x2 = max(int(rectangle[0].x()), int(rectangle[1].x()))
+    y1 = min(int(rectangle[0].y()), int(rectangle[1].y()))
+    y2 = max(int(rectangle[0].y()), int(rectangle[1].y()))
+    x1, x2 = max(0, x1), min(width, x2)
+    y1, y2 = max(0, y1), min(height, y2)
+    if x1 >= x2 or y1 >= y2:
+        return []
+
+    # Only the rectangle is analysed. It is surrounded with 1px of
+    # foreground where the page continues, so that (like the pixels outside
+    # of the rectangle) it merges with the components touching the border.
+    pad_top, pad_bottom = int(y1 > 0), int(y2 < height)
+    pad_left, pad_right = int(x1 > 0), int(x2 < width)
+    label = np.full(
+        (y2 - y1 + pad_top + pad_bottom, x2 - x1 + pad_left + pad_right),
+        255,
+        dtype=np_image.dtype,
+    )
+    # 在qimage_to_np_array做了 to binary image
     # cc找白色區域，所以反白
-    label = cv2.bitwise_not(label)
-    # cv2.imshow('aaa', label)
-    
+    label[
+        pad_top : pad_top + y2 - y1, pad_left : pad_left + x2 - x1
+    ] = cv2.bitwise_not(np_image[y1:y2, x1:x2])
+
     ccRegion = []
-    GLabels, _, GStats, _ = cv2.connectedComponentsWithStats(label)
-    for GLabel in range(2, GLabels, 1):
+    GLabels, GImage, GStats, _ = cv2.connectedComponentsWithStats(label)
+    # components connected to the padding are outside of the rectangle
+    outside = set()
+    if pad_top:
+        outside.update(np.unique(GImage[0, :]))
+    if pad_bottom:
+        outside.update(np.unique(GImage[-1, :]))
+    if pad_left:
+        outside.update(np.unique(GImage[:, 0]))
+    if pad_right:
+        outside.update(np.unique(GImage[:, -1]))
+    offset_x = x1 - pad_left
+    offset_y = y1 - pad_top
+    for GLabel in range(1, GLabels, 1):
+        if GLabel in outside:
+            continue
         area = GStats[GLabel, cv2.CC_STAT_AREA]
         # top left
-        p1 = [GStats[GLabel, cv2.CC_STAT_LEFT], GStats[GLabel, cv2.CC_STAT_TOP]]
+        p1 = [
+            GStats[GLabel, cv2.CC_STAT_LEFT] + offset_x,
+            GStats[GLabel, cv2.CC_STAT_TOP] + offset_y,
+        ]
         GObjectW = GStats[GLabel, cv2.CC_STAT_WIDTH]
         GObjectH = GStats[GLabel, cv2.CC_STAT_HEIGHT]
         # right bottom
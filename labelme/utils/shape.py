@@ -1,5 +1,4 @@
 import math
-import uuid
 
 import numpy as np
 import PIL.Image
@@ -19,58 +18,108 @@ def polygons_to_mask(img_shape, polygons, shape_type=None):
 def shape_to_mask(
     img_shape, points, shape_type=None, line_width=10, point_size=5
 ):
-    mask = np.zeros(img_shape[:2], dtype=np.uint8)
-    mask = PIL.Image.fromarray(mask)
-    draw = PIL.ImageDraw.Draw(mask)
+    mask = np.zeros(img_shape[:2], dtype=bool)
+    bbox_mask, (y1, x1, y2, x2) = shape_to_bbox_mask(
+        img_shape,
+        points,
+        shape_type=shape_type,
+        line_width=line_width,
+        point_size=point_size,
+    )
+    mask[y1:y2, x1:x2] = bbox_mask
+    return mask
+
+
+def shape_to_bbox_mask(
+    img_shape, points, shape_type=None, line_width=10, point_size=5
+):
+    """Rasterize a shape only inside of its bounding box.
+
+    Returns the mask of the bounding box and the box as (y1, x1, y2, x2).
+    The pixels are those PIL.ImageDraw draws on an image of img_shape,
+    which are all inside of the box.
+    """
     xy = [tuple(point) for point in points]
     if shape_type == "circle":
         assert len(xy) == 2, "Shape of shape_type=circle must have 2 points"
         (cx, cy), (px, py) = xy
         d = math.sqrt((cx - px) ** 2 + (cy - py) ** 2)
-        draw.ellipse([cx - d, cy - d, cx + d, cy + d], outline=1, fill=1)
+        extent = [(cx - d, cy - d), (cx + d, cy + d)]
     elif shape_type == "rectangle":
         assert len(xy) == 2, "Shape of shape_type=rectangle must have 2 points"
-        draw.rectangle(xy, outline=1, fill=1)
-    elif shape_type == "line":
-        assert len(xy) == 2, "Shape of shape_type=line must have 2 points"
-        draw.line(xy=xy, fill=1, width=line_width)
-    elif shape_type == "linestrip":
-        draw.line(xy=xy, fill=1, width=line_width)
+        extent = xy
+    elif shape_type in ["line", "linestrip"]:
+        if shape_type == "line":
+            assert len(xy) == 2, "Shape of shape_type=line must have 2 points"
+        extent = [(x, y) for x, y in xy]
+        extent += [(x - line_width, y - line_width) for x, y in xy]
+        extent += [(x + line_width, y + line_width) for x, y in xy]
     elif shape_type == "point":
         assert len(xy) == 1, "Shape of shape_type=point must have 1 points"
         cx, cy = xy[0]
         r = point_size
-        draw.ellipse([cx - r, cy - r, cx + r, cy + r], outline=1, fill=1)
+        extent = [(cx - r, cy - r), (cx + r, cy + r)]
     else:
         assert len(xy) > 2, "Polygon must have points more than 2"
+        extent = xy
+
+    # 2px margin for the outline, then clip to the image
+    height, width = img_shape[:2]
+    xs = [x for x, _ in extent]
+    ys = [y for _, y in extent]
+    x1 = min(max(int(math.floor(min(xs))) - 2, 0), width)
+    y1 = min(max(int(math.floor(min(ys))) - 2, 0), height)
+    x2 = min(max(int(math.ceil(max(xs))) + 3, x1), width)
+    y2 = min(max(int(math.ceil(max(ys))) + 3, y1), height)
+    if x1 == x2 or y1 == y2:
+        return np.zeros((y2 - y1, x2 - x1), dtype=bool), (y1, x1, y2, x2)
+
+    # only shifted by rows: Pillow rounds the x of polygon and line edges
+    # differently at another x offset, which would move some pixels by 1px
+    mask = PIL.Image.new("L", (x2, y2 - y1), 0)
+    draw = PIL.ImageDraw.Draw(mask)
+    xy = [(x, y - y1) for x, y in xy]
+    if shape_type == "circle":
+        (cx, cy), _ = xy
+        draw.ellipse([cx - d, cy - d, cx + d, cy + d], outline=1, fill=1)
+    elif shape_type == "rectangle":
+        draw.rectangle(xy, outline=1, fill=1)
+    elif shape_type in ["line", "linestrip"]:
+        draw.line(xy=xy, fill=1, width=line_width)
+    elif shape_type == "point":
+        cx, cy = xy[0]
+        draw.ellipse([cx - r, cy - r, cx + r, cy + r], outline=1, fill=1)
+    else:
         draw.polygon(xy=xy, outline=1, fill=1)
-    mask = np.array(mask, dtype=bool)
-    return mask
+    mask = np.array(mask, dtype=bool)[:, x1:]
+    return mask, (y1, x1, y2, x2)
 
 
 def shapes_to_label(img_shape, shapes, label_name_to_value):
     cls = np.zeros(img_shape[:2], dtype=np.int32)
     ins = np.zeros_like(cls)
-    instances = []
-    for shape in shapes:
+    instance_to_id = {}
+    for i, shape in enumerate(shapes):
         points = shape["points"]
         label = shape["label"]
         group_id = shape.get("group_id")
         if group_id is None:
-            group_id = uuid.uuid1()
+            # ungrouped shapes are separate instances, keyed by their index
+            # so that the ids are the same on every run
+            group_id = (None, i)
         shape_type = shape.get("shape_type", None)
 
         cls_name = label
         instance = (cls_name, group_id)
 
-        if instance not in instances:
-            instances.append(instance)
-        ins_id = instances.index(instance) + 1
+        ins_id = instance_to_id.setdefault(instance, len(instance_to_id) + 1)
         cls_id = label_name_to_value[cls_name]
 
-        mask = shape_to_mask(img_shape[:2], points, shape_type)
-        cls[mask] = cls_id
-        ins[mask] = ins_id
+        mask, (y1, x1, y2, x2) = shape_to_bbox_mask(
+            img_shape[:2], points, shape_type
+        )
+        cls[y1:y2, x1:x2][mask] = cls_id
+        ins[y1:y2, x1:x2][mask] = ins_id
 
     return cls, ins
 
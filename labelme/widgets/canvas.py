@@ -3,7 +3,11 @@ from qtpy import QtGui
 from qtpy import QtWidgets
 
 from labelme import QT5
+from labelme.pyramid import get_default_cache_dir
+from labelme.pyramid import ImagePyramid
 from labelme.shape import Shape
+from labelme.shape_history import ShapeHistory
+from labelme.spatial_index import GridIndex
 import labelme.utils
 
 from qtpy.QtCore import QPointF
@@ -39,6 +43,8 @@ class Canvas(QtWidgets.QWidget):
     def __init__(self, *args, **kwargs):
         self.epsilon = kwargs.pop("epsilon", 10.0)
         self.double_click = kwargs.pop("double_click", "close")
+        undo_limit = kwargs.pop("undo_limit", 100)
+        self.pyramid_options = kwargs.pop("pyramid", None) or {}
         if self.double_click not in [None, "close"]:
             raise ValueError(
                 "Unexpected value for double_click event: {}".format(
@@ -49,7 +55,9 @@ class Canvas(QtWidgets.QWidget):
         # Initialise local state.
         self.mode = self.EDIT
         self.shapes = []
-        self.shapesBackups = []
+        # bounding boxes of self.shapes for hit-testing
+        self.shapeIndex = GridIndex()
+        self.history = ShapeHistory(limit=undo_limit)
         self.current = None
         self.selectedShapes = []  # save the selected shapes here
         self.selectedShapesCopy = []
@@ -64,6 +72,7 @@ class Canvas(QtWidgets.QWidget):
         self.offsets = QtCore.QPoint(), QtCore.QPoint()
         self.scale = 1.0
         self.pixmap = QtGui.QPixmap()
+        self.pyramid = None
         self.visible = {}
         self.visibleLabel = {
             "Bubble" : True,
@@ -120,30 +129,88 @@ class Canvas(QtWidgets.QWidget):
             raise ValueError("Unsupported createMode: %s" % value)
         self._createMode = value
 
-    def storeShapes(self):
-        shapesBackup = []
-        for shape in self.shapes:
-            shapesBackup.append(shape.copy())
-        if len(self.shapesBackups) >= 10:
-            self.shapesBackups = self.shapesBackups[-9:]
-        self.shapesBackups.append(shapesBackup)
+    def storeShapes(self, shapes=None):
+        """Record the edits since the last call as one undo step.
+
+        Edits made through Canvas are tracked automatically, shapes changed
+        elsewhere (e.g. relabelled) have to be passed.
+        Returns True if anything changed.
+        """
+        if shapes is not None:
+            self.history.touch(shapes)
+        return self.history.commit(self.shapes)
+
+    def discardLastStore(self):
+        """Merge the last undo step into the next one."""
+        self.history.discard()
 
     @property
     def isShapeRestorable(self):
-        if len(self.shapesBackups) < 2:
-            return False
-        return True
+        return self.history.canUndo()
+
+    @property
+    def isShapeRedoable(self):
+        return self.history.canRedo()
 
     def restoreShape(self):
         if not self.isShapeRestorable:
             return
-        self.shapesBackups.pop()  # latest
-        shapesBackup = self.shapesBackups.pop()
-        self.shapes = shapesBackup
-        self.selectedShapes = []
-        for shape in self.shapes:
+        self._loadHistory(*self.history.undo())
+
+    def redoShape(self):
+        if not self.isShapeRedoable:
+            return
+        self._loadHistory(*self.history.redo())
+
+    def _loadHistory(self, shapes, changed):
+        if shapes is not None:
+            self.shapes = shapes
+            self.rebuildShapeIndex()
+        else:
+            self.updateShapeIndex(changed)
+        for shape in self.selectedShapes:
             shape.selected = False
-        self.repaint()
+        self.selectedShapes = []
+        self.update()
+
+    def rebuildShapeIndex(self):
+        self.shapeIndex.clear()
+        self.updateShapeIndex(self.shapes, add=True)
+
+    def updateShapeIndex(self, shapes, add=False):
+        """Re-index shapes after their points changed.
+
+        Shapes which are not on the canvas (e.g. the copies being dragged)
+        are ignored unless add is True.
+        """
+        for shape in shapes:
+            if not (add or shape in self.shapeIndex):
+                continue
+            rect = shape.boundingRect()
+            self.shapeIndex.insert(
+                shape, (rect.left(), rect.top(), rect.right(), rect.bottom())
+            )
+            if not add:
+                self.history.touch([shape])
+
+    def addShapes(self, shapes):
+        self.shapes.extend(shapes)
+        self.updateShapeIndex(shapes, add=True)
+        self.history.touch(shapes)
+        self.history.touchOrder()
+
+    def removeShapes(self, shapes):
+        removed = set(shapes)
+        self.shapes[:] = [s for s in self.shapes if s not in removed]
+        for shape in removed:
+            self.shapeIndex.remove(shape)
+        self.history.touch(removed)
+        self.history.touchOrder()
+
+    def shapesAt(self, point, epsilon=0):
+        """Visible shapes near the point, topmost first."""
+        shapes = self.shapeIndex.queryPoint(point.x(), point.y(), epsilon)
+        return [s for s in reversed(shapes) if self.isVisible(s)]
 
     def enterEvent(self, ev):
         self.overrideCursor(self._cursor)
@@ -183,7 +250,7 @@ class Canvas(QtWidgets.QWidget):
     def unHighlight(self):
         if self.hShape:
             self.hShape.highlightClear()
-            self.update()
+            self.updateShapes([self.hShape])
         self.prevhShape = self.hShape
         self.prevhVertex = self.hVertex
         self.prevhEdge = self.hEdge
@@ -213,6 +280,7 @@ class Canvas(QtWidgets.QWidget):
             if not self.current:
                 return
 
+            dirty = self.shapesRect([self.current, self.line])
             if self.outOfPixmap(pos):
                 # Don't allow the user to draw outside the pixmap.
                 # Project the point to the pixmap's edges.
@@ -242,7 +310,8 @@ class Canvas(QtWidgets.QWidget):
             elif self.createMode == "point":
                 self.line.points = [self.current[0]]
                 self.line.close()
-            self.repaint()
+            # painted right away as the highlight is cleared below
+            self.updateShapes([self.current, self.line], dirty, sync=True)
             self.current.highlightClear()
             return
 
@@ -250,25 +319,28 @@ class Canvas(QtWidgets.QWidget):
         if QtCore.Qt.RightButton & ev.buttons():
             if self.selectedShapesCopy and self.prevPoint:
                 self.overrideCursor(CURSOR_MOVE)
+                dirty = self.shapesRect(self.selectedShapesCopy)
                 self.boundedMoveShapes(self.selectedShapesCopy, pos)
-                self.repaint()
+                self.updateShapes(self.selectedShapesCopy, dirty)
             elif self.selectedShapes:
                 self.selectedShapesCopy = [
                     s.copy() for s in self.selectedShapes
                 ]
-                self.repaint()
+                self.updateShapes(self.selectedShapesCopy)
             return
 
         # Polygon/Vertex moving.
         if QtCore.Qt.LeftButton & ev.buttons():
             if self.selectedVertex():
+                dirty = self.shapesRect([self.hShape])
                 self.boundedMoveVertex(pos)
-                self.repaint()
+                self.updateShapes([self.hShape], dirty)
                 self.movingShape = True
             elif self.selectedShapes and self.prevPoint:
                 self.overrideCursor(CURSOR_MOVE)
+                dirty = self.shapesRect(self.selectedShapes)
                 self.boundedMoveShapes(self.selectedShapes, pos)
-                self.repaint()
+                self.updateShapes(self.selectedShapes, dirty)
                 self.movingShape = True
             return
 
@@ -277,7 +349,8 @@ class Canvas(QtWidgets.QWidget):
         # - Highlight vertex
         # Update shape/vertex fill and tooltip value accordingly.
         self.setToolTip(self.tr("Image"))
-        for shape in reversed([s for s in self.shapes if self.isVisible(s)]):
+        prevHighlight = self.hShape, self.hVertex
+        for shape in self.shapesAt(pos, self.epsilon / self.scale):
             # Look for a nearby vertex to highlight. If that fails,
             # check if we happen to be inside a shape.
             index = shape.nearestVertex(pos, self.epsilon / self.scale)
@@ -292,7 +365,6 @@ class Canvas(QtWidgets.QWidget):
                 self.overrideCursor(CURSOR_POINT)
                 self.setToolTip(self.tr("Click & drag to move point"))
                 self.setStatusTip(self.toolTip())
-                self.update()
                 break
             elif shape.containsPoint(pos):
                 if self.selectedVertex():
@@ -306,10 +378,11 @@ class Canvas(QtWidgets.QWidget):
                 )
                 self.setStatusTip(self.toolTip())
                 self.overrideCursor(CURSOR_GRAB)
-                self.update()
                 break
         else:  # Nothing found, clear highlights, reset state.
             self.unHighlight()
+        if (self.hShape, self.hVertex) != prevHighlight:
+            self.updateShapes([prevHighlight[0], self.hShape])
         self.edgeSelected.emit(self.hEdge is not None, self.hShape)
         self.vertexSelected.emit(self.hVertex is not None)
 
@@ -320,6 +393,7 @@ class Canvas(QtWidgets.QWidget):
         if shape is None or index is None or point is None:
             return
         shape.insertPoint(index, point)
+        self.updateShapeIndex([shape])
         shape.highlightVertex(index, shape.MOVE_VERTEX)
         self.hShape = shape
         self.hVertex = index
@@ -333,6 +407,7 @@ class Canvas(QtWidgets.QWidget):
             return
         index = shape.nearestVertex(point, self.epsilon)
         shape.removePoint(index)
+        self.updateShapeIndex([shape])
         # shape.highlightVertex(index, shape.MOVE_VERTEX)
         self.hShape = shape
         self.hVertex = None
@@ -380,12 +455,12 @@ class Canvas(QtWidgets.QWidget):
                 group_mode = int(ev.modifiers()) == QtCore.Qt.ControlModifier
                 self.selectShapePoint(pos, multiple_selection_mode=group_mode)
                 self.prevPoint = pos
-                self.repaint()
+                self.update()
         elif ev.button() == QtCore.Qt.RightButton and self.editing():
             group_mode = int(ev.modifiers()) == QtCore.Qt.ControlModifier
             self.selectShapePoint(pos, multiple_selection_mode=group_mode)
             self.prevPoint = pos
-            self.repaint()
+            self.update()
 
     def mouseReleaseEvent(self, ev):
         if ev.button() == QtCore.Qt.RightButton:
@@ -397,17 +472,12 @@ class Canvas(QtWidgets.QWidget):
             ):
                 # Cancel the move by deleting the shadow copy.
                 self.selectedShapesCopy = []
-                self.repaint()
+                self.update()
         elif ev.button() == QtCore.Qt.LeftButton and self.selectedShapes:
             self.overrideCursor(CURSOR_GRAB)
 
         if self.movingShape and self.hShape:
-            index = self.shapes.index(self.hShape)
-            if (
-                self.shapesBackups[-1][index].points
-                != self.shapes[index].points
-            ):
-                self.storeShapes()
+            if self.storeShapes():
                 self.shapeMoved.emit()
 
             self.movingShape = False
@@ -416,15 +486,16 @@ class Canvas(QtWidgets.QWidget):
         assert self.selectedShapes and self.selectedShapesCopy
         assert len(self.selectedShapesCopy) == len(self.selectedShapes)
         if copy:
+            self.addShapes(self.selectedShapesCopy)
             for i, shape in enumerate(self.selectedShapesCopy):
-                self.shapes.append(shape)
                 self.selectedShapes[i].selected = False
                 self.selectedShapes[i] = shape
         else:
             for i, shape in enumerate(self.selectedShapesCopy):
                 self.selectedShapes[i].points = shape.points
+            self.updateShapeIndex(self.selectedShapes)
         self.selectedShapesCopy = []
-        self.repaint()
+        self.update()
         self.storeShapes()
         return True
 
@@ -434,7 +505,7 @@ class Canvas(QtWidgets.QWidget):
             # Only hide other shapes if there is a current selection.
             # Otherwise the user will not be able to select a shape.
             self.setHiding(True)
-            self.repaint()
+            self.update()
 
     def setHiding(self, enable=True):
         self._hideBackround = self.hideBackround if enable else False
@@ -464,8 +535,8 @@ class Canvas(QtWidgets.QWidget):
             index, shape = self.hVertex, self.hShape
             shape.highlightVertex(index, shape.MOVE_VERTEX)
         else:
-            for shape in reversed(self.shapes):
-                if self.isVisible(shape) and shape.containsPoint(point):
+            for shape in self.shapesAt(point):
+                if shape.containsPoint(point):
                     self.calculateOffsets(shape, point)
                     self.setHiding()
                     if multiple_selection_mode:
@@ -492,6 +563,7 @@ class Canvas(QtWidgets.QWidget):
         if self.outOfPixmap(pos):
             pos = self.intersectionPoint(point, pos)
         shape.moveVertexBy(index, pos - point)
+        self.updateShapeIndex([shape])
 
     def boundedMoveShapes(self, shapes, pos):
         if self.outOfPixmap(pos):
@@ -514,6 +586,7 @@ class Canvas(QtWidgets.QWidget):
         if dp:
             for shape in shapes:
                 shape.moveBy(dp)
+            self.updateShapeIndex(shapes)
             self.prevPoint = pos
             return True
         return False
@@ -527,9 +600,8 @@ class Canvas(QtWidgets.QWidget):
     def deleteSelected(self):
         deleted_shapes = []
         if self.selectedShapes:
-            for shape in self.selectedShapes:
-                self.shapes.remove(shape)
-                deleted_shapes.append(shape)
+            self.removeShapes(self.selectedShapes)
+            deleted_shapes.extend(self.selectedShapes)
             self.storeShapes()
             self.selectedShapes = []
             self.update()
@@ -565,7 +637,17 @@ class Canvas(QtWidgets.QWidget):
         p.scale(self.scale, self.scale)
         p.translate(self.offsetToCenter())
 
-        p.drawPixmap(0, 0, self.pixmap)
+        # only draw what is inside of the exposed area
+        exposed = self.widgetToImageRect(event.rect())
+        source = (
+            exposed.toAlignedRect()
+            .adjusted(-1, -1, 1, 1)
+            .intersected(self.pixmap.rect())
+        )
+        if self.pyramid is None or not self.pyramid.draw(
+            p, source, self.scale, fallback=self.pixmap
+        ):
+            p.drawPixmap(source, self.pixmap, source)
         Shape.scale = self.scale
 
         # "Bubble" : True,
@@ -573,7 +655,11 @@ class Canvas(QtWidgets.QWidget):
         # "Onomatopoeia" : True,
         # "Onomatopoeia-Content" : True,
 
-        for shape in self.shapes:
+        m = self.paintMargin()
+        exposed.adjust(-m, -m, m, m)
+        for shape in self.shapeIndex.query(
+            (exposed.left(), exposed.top(), exposed.right(), exposed.bottom())
+        ):
             if (shape.selected or not self._hideBackround) and self.isVisible(shape):
                 shape.fill = shape.selected or shape == self.hShape
                 shape.paint(p)
@@ -585,6 +671,8 @@ class Canvas(QtWidgets.QWidget):
             for cc in self.ccRegion:
                 if cc[1] < self.minArea:
                     continue
+                if not exposed.intersects(cc[0].boundingRect()):
+                    continue
                 cc[0].paint(p)
                 
         if self.selectedShapesCopy:
@@ -608,6 +696,59 @@ class Canvas(QtWidgets.QWidget):
         """Convert from widget-logical coordinates to painter-logical ones."""
         return point / self.scale - self.offsetToCenter()
 
+    def widgetToImageRect(self, rect):
+        s = self.scale
+        offset = self.offsetToCenter()
+        return QtCore.QRectF(
+            rect.x() / s - offset.x(),
+            rect.y() / s - offset.y(),
+            rect.width() / s,
+            rect.height() / s,
+        )
+
+    def imageToWidgetRect(self, rect):
+        s = self.scale
+        offset = self.offsetToCenter()
+        return (
+            QtCore.QRectF(
+                (rect.x() + offset.x()) * s,
+                (rect.y() + offset.y()) * s,
+                rect.width() * s,
+                rect.height() * s,
+            )
+            .toAlignedRect()
+            .adjusted(-1, -1, 1, 1)
+        )
+
+    def paintMargin(self):
+        """Size of vertices and pen around shape outlines in image pixels."""
+        return (2.0 * Shape.point_size + 2.0) / self.scale
+
+    def shapesRect(self, shapes):
+        """Area painted by the shapes in image coordinates."""
+        m = self.paintMargin()
+        rect = QtCore.QRectF()
+        for shape in shapes:
+            if shape is None or not shape.points:
+                continue
+            rect = rect.united(shape.boundingRect().adjusted(-m, -m, m, m))
+        return rect
+
+    def updateShapes(self, shapes, rect=None, sync=False):
+        """Repaint the area of the shapes.
+
+        rect is added to the area, e.g. where the shapes were before a move.
+        """
+        dirty = self.shapesRect(shapes)
+        if rect is not None:
+            dirty = dirty.united(rect)
+        if dirty.isEmpty():
+            return
+        if sync:
+            self.repaint(self.imageToWidgetRect(dirty))
+        else:
+            self.update(self.imageToWidgetRect(dirty))
+
     def offsetToCenter(self):
         s = self.scale
         area = super(Canvas, self).size()
@@ -624,7 +765,7 @@ class Canvas(QtWidgets.QWidget):
     def finalise(self):
         assert self.current
         self.current.close()
-        self.shapes.append(self.current)
+        self.addShapes([self.current])
         self.storeShapes()
         self.current = None
         self.setHiding(False)
@@ -745,13 +886,14 @@ class Canvas(QtWidgets.QWidget):
         assert text
         self.shapes[-1].label = text
         self.shapes[-1].flags = flags
-        self.shapesBackups.pop()
+        self.discardLastStore()
         self.storeShapes()
         return self.shapes[-1]
 
     def undoLastLine(self):
         assert self.shapes
-        self.current = self.shapes.pop()
+        self.current = self.shapes[-1]
+        self.removeShapes([self.current])
         self.current.setOpen()
         if self.createMode in ["polygon", "linestrip"]:
             self.line.points = [self.current[-1], self.current[0]]
@@ -770,29 +912,66 @@ class Canvas(QtWidgets.QWidget):
         else:
             self.current = None
             self.drawingPolygon.emit(False)
-        self.repaint()
+        self.update()
 
-    def loadPixmap(self, pixmap, clear_shapes=True):
+    def loadPixmap(self, pixmap, clear_shapes=True, image=None):
+        # image is the QImage of pixmap if the caller has it, so that the
+        # pyramid does not need another copy of the image from toImage()
         self.pixmap = pixmap
+        self.loadPyramid(image)
         if clear_shapes:
             self.shapes = []
-        self.repaint()
+            self.shapeIndex.clear()
+        self.update()
+
+    def loadPyramid(self, image=None):
+        """Prepare downscaled tiles if the pixmap is large."""
+        if self.pyramid is not None:
+            self.pyramid.close()
+            self.pyramid = None
+        min_size = self.pyramid_options.get("min_size")
+        if (
+            min_size is None
+            or not self.pixmap
+            or max(self.pixmap.width(), self.pixmap.height()) < min_size
+        ):
+            return
+        cache_dir = self.pyramid_options.get("cache_dir")
+        if cache_dir is None:
+            cache_dir = get_default_cache_dir()
+        if image is None:
+            image = self.pixmap.toImage()
+        self.pyramid = ImagePyramid(
+            image,
+            tile_size=self.pyramid_options.get("tile_size", 512),
+            cache_dir=cache_dir,
+            cache_size=self.pyramid_options.get("cache_size_mb", 1024)
+            * 1024 ** 2,
+        )
+        self.pyramid.tileReady.connect(self.update)
 
     def loadShapes(self, shapes, replace=True):
         if replace:
             self.shapes = list(shapes)
+            self.rebuildShapeIndex()
+            if self.history.isEmpty():
+                # initial state of the file, nothing to undo
+                self.history.reset(self.shapes)
+            else:
+                self.history.touch(self.shapes)
+                self.history.touchOrder()
         else:
-            self.shapes.extend(shapes)
+            self.addShapes(shapes)
         self.storeShapes()
         self.current = None
         self.hShape = None
         self.hVertex = None
         self.hEdge = None
-        self.repaint()
+        self.update()
 
     def setShapeVisible(self, shape, value):
         self.visible[shape] = value
-        self.repaint()
+        self.update()
 
     def overrideCursor(self, cursor):
         self.restoreCursor()
@@ -805,7 +984,8 @@ class Canvas(QtWidgets.QWidget):
     def resetState(self):
         self.restoreCursor()
         self.pixmap = None
-        self.shapesBackups = []
+        self.loadPyramid()
+        self.history.clear()
         self.update()
 
     def setMinAreaValue(self, minVal=16):
@@ -0,0 +1,172 @@
+from qtpy import QtCore
+from qtpy.QtCore import Qt
+from qtpy import QtWidgets
+
+
+class FileListModel(QtCore.QAbstractListModel):
+    """Filenames with their label state, optionally filtered by a pattern.
+
+    Only the data of the rows on screen is ever requested by the view, so
+    no per-file item objects are created.
+    """
+
+    def __init__(self, parent=None):
+        super(FileListModel, self).__init__(parent)
+        self._allFiles = []
+        self._allFilesSet = set()
+        self._files = []  # files matching the pattern
+        self._rows = {}  # file -> row in self._files
+        self._labeled = set()
+        self._pattern = None
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._files)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        filename = self._files[index.row()]
+        if role in [Qt.DisplayRole, Qt.ToolTipRole]:
+            return filename
+        if role == Qt.CheckStateRole:
+            if filename in self._labeled:
+                return Qt.Checked
+            return Qt.Unchecked
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def _matches(self, filename):
+        return not self._pattern or self._pattern in filename
+
+    def filename(self, row):
+        return self._files[row]
+
+    def filenames(self):
+        return list(self._files)
+
+    def allFilenames(self):
+        return list(self._allFiles)
+
+    def row(self, filename):
+        """Return the row of filename, or -1 if it is not shown."""
+        return self._rows.get(filename, -1)
+
+    def __contains__(self, filename):
+        return filename in self._allFilesSet
+
+    def clear(self):
+        self.beginResetModel()
+        self._allFiles = []
+        self._allFilesSet = set()
+        self._files = []
+        self._rows = {}
+        self._labeled = set()
+        self.endResetModel()
+
+    def addFiles(self, filenames, labeled):
+        files = []
+        for filename, is_labeled in zip(filenames, labeled):
+            self._allFiles.append(filename)
+            self._allFilesSet.add(filename)
+            if is_labeled:
+                self._labeled.add(filename)
+            if self._matches(filename):
+                files.append(filename)
+        if not files:
+            return
+        first = len(self._files)
+        self.beginInsertRows(
+            QtCore.QModelIndex(), first, first + len(files) - 1
+        )
+        self._files.extend(files)
+        for row, filename in enumerate(files, first):
+            self._rows[filename] = row
+        self.endInsertRows()
+
+    def setPattern(self, pattern):
+        self.beginResetModel()
+        self._pattern = pattern
+        self._files = [f for f in self._allFiles if self._matches(f)]
+        self._rows = {f: row for row, f in enumerate(self._files)}
+        self.endResetModel()
+
+    def isLabeled(self, filename):
+        return filename in self._labeled
+
+    def setLabeled(self, filename, labeled):
+        if labeled:
+            self._labeled.add(filename)
+        else:
+            self._labeled.discard(filename)
+        row = self.row(filename)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+
+    def resetLabeled(self, labeled):
+        self._labeled = set(labeled)
+        if self._files:
+            self.dataChanged.emit(
+                self.index(0),
+                self.index(len(self._files) - 1),
+                [Qt.CheckStateRole],
+            )
+
+
+class FileListWidget(QtWidgets.QListView):
+
+    itemSelectionChanged = QtCore.Signal()
+
+    def __init__(self):
+        super(FileListWidget, self).__init__()
+        self.setModel(FileListModel(self))
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.selectionModel().selectionChanged.connect(
+            self.itemSelectionChanged
+        )
+
+    def count(self):
+        return self.model().rowCount()
+
+    def filenames(self):
+        return self.model().filenames()
+
+    def filename(self, row):
+        return self.model().filename(row)
+
+    def row(self, filename):
+        return self.model().row(filename)
+
+    def currentRow(self):
+        index = self.currentIndex()
+        if not index.isValid():
+            return -1
+        return index.row()
+
+    def setCurrentRow(self, row):
+        self.setCurrentIndex(self.model().index(row))
+
+    def selectedFilenames(self):
+        return [
+            self.model().filename(index.row())
+            for index in self.selectedIndexes()
+        ]
+
+    def clear(self):
+        self.model().clear()
+
+    def addFiles(self, filenames, labeled):
+        self.model().addFiles(filenames, labeled)
+
+    def setPattern(self, pattern):
+        self.model().setPattern(pattern)
+
+    def setLabeled(self, filename, labeled):
+        self.model().setLabeled(filename, labeled)
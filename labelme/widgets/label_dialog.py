@@ -32,6 +32,7 @@ class MyCanvas(QtWidgets.QWidget):
         self.parent = parent
         self.pixmap = None
         self.np_image = None
+        self.integral = None
         
         self._painter = QtGui.QPainter()
 
@@ -60,10 +61,11 @@ class MyCanvas(QtWidgets.QWidget):
 
         self.leftBoundary = self.rightBoundary = self.topBoundary = self.bottomBoundary = False
 
-    def initialize(self, pixmap, np_image, pos, rect):
+    def initialize(self, pixmap, np_image, pos, rect, integral=None):
         self.scale = 1.0
         self.pixmap = pixmap
         self.np_image = np_image
+        self.integral = integral
         self.box = {
             'xmin'  : min(rect[0].x(), rect[1].x()),
             'ymin'  : min(rect[0].y(), rect[1].y()),
@@ -98,7 +100,7 @@ class MyCanvas(QtWidgets.QWidget):
         self.update()
     
     def clean(self):
-        self.pixmap = self.np_image = None
+        self.pixmap = self.np_image = self.integral = None
         self.box = None
         
         self.col_lines = []
@@ -228,7 +230,9 @@ class MyCanvas(QtWidgets.QWidget):
                         topLeft,
                         bottomRight,
                     )
-                    if not shape.isWhiteRect(self.np_image):
+                    if not shape.isWhiteRect(
+                        self.np_image, integral=self.integral
+                    ):
                         shapes.append(shape)
 
         if ifClean:
@@ -486,8 +490,8 @@ class SubWindow(QtWidgets.QMainWindow):
         
         self.moveVal = QtCore.QPoint(0, 0)
         
-    def initialize(self, pixmap, np_image, pos, rect):
-        self.canvas.initialize(pixmap, np_image, pos, rect)
+    def initialize(self, pixmap, np_image, pos, rect, integral=None):
+        self.canvas.initialize(pixmap, np_image, pos, rect, integral=integral)
         area = super(SubWindow, self).size()
         aw, ah = area.width(), area.height()
         self.moveVal = pos - QtCore.QPoint(area.width(), 0)
@@ -876,7 +880,13 @@ class LabelDialog(QtWidgets.QDialog):
                 self.move(QtWidgets.QApplication.desktop().screen().rect().center() - self.rect().center())
             # initialize sub window
             if mode == 'text_grid':
-                self.sub_window.initialize(pixmap=self.app.canvas.pixmap, np_image=self.app.np_image_b, pos=self.pos(), rect=shape)
+                self.sub_window.initialize(
+                    pixmap=self.app.canvas.pixmap,
+                    np_image=self.app.np_image_b,
+                    pos=self.pos(),
+                    rect=shape,
+                    integral=self.app.np_integral_b,
+                )
                 self.sub_window.show()
                 self.sub_window.move(self.sub_window.moveVal)
                 self.sub_window.update()
@@ -82,7 +82,13 @@ class LabelListWidgetItem(QtGui.QStandardItem):
         return LabelListWidgetItem(self.text(), self.shape())
 
     def setShape(self, shape):
-        self.setData(shape, Qt.UserRole)
+        model = self.model()
+        if isinstance(model, StandardItemModel):
+            model.unindexItem(self)
+            self.setData(shape, Qt.UserRole)
+            model.indexItem(self)
+        else:
+            self.setData(shape, Qt.UserRole)
 
     def shape(self):
         return self.data(Qt.UserRole)
@@ -98,8 +104,43 @@ class StandardItemModel(QtGui.QStandardItemModel):
 
     itemDropped = QtCore.Signal()
 
+    def __init__(self, *args, **kwargs):
+        super(StandardItemModel, self).__init__(*args, **kwargs)
+        self._shapeToItem = {}
+        self.rowsInserted.connect(self._onRowsInserted)
+        self.rowsAboutToBeRemoved.connect(self._onRowsAboutToBeRemoved)
+        self.modelReset.connect(self._shapeToItem.clear)
+
+    def indexItem(self, item):
+        if isinstance(item, LabelListWidgetItem):
+            self._shapeToItem[item.shape()] = item
+
+    def unindexItem(self, item):
+        if not isinstance(item, LabelListWidgetItem):
+            return
+        shape = item.shape()
+        # a dropped item is inserted before the original one is removed
+        if self._shapeToItem.get(shape) is item:
+            del self._shapeToItem[shape]
+
+    def findItemByShape(self, shape):
+        return self._shapeToItem.get(shape)
+
+    def _onRowsInserted(self, parent, first, last):
+        for row in range(first, last + 1):
+            self.indexItem(self.item(row))
+
+    def _onRowsAboutToBeRemoved(self, parent, first, last):
+        for row in range(first, last + 1):
+            self.unindexItem(self.item(row))
+
     def removeRows(self, *args, **kwargs):
         ret = super().removeRows(*args, **kwargs)
+        # dropped items get their data after being inserted, so index them
+        # once the drag and drop is done
+        self._shapeToItem.clear()
+        for row in range(self.rowCount()):
+            self.indexItem(self.item(row))
         self.itemDropped.emit()
         return ret
 
@@ -161,24 +202,40 @@ class LabelListWidget(QtWidgets.QListView):
         self.scrollTo(self.model().indexFromItem(item))
 
     def addItem(self, item):
-        if not isinstance(item, LabelListWidgetItem):
-            raise TypeError("item must be LabelListWidgetItem")
-        self.model().setItem(self.model().rowCount(), 0, item)
-        item.setSizeHint(self.itemDelegate().sizeHint(None, None))
+        self.addItems([item])
+
+    def addItems(self, items):
+        """Append items with a single insertion into the model."""
+        for item in items:
+            if not isinstance(item, LabelListWidgetItem):
+                raise TypeError("item must be LabelListWidgetItem")
+        if not items:
+            return
+        sizeHint = self.itemDelegate().sizeHint(None, None)
+        for item in items:
+            item.setSizeHint(sizeHint)
+        self.model().invisibleRootItem().appendRows(items)
 
     def removeItem(self, item):
         index = self.model().indexFromItem(item)
-        self.model().removeRows(index.row(), 1)
+        # not through removeRows() which reports a drag and drop
+        QtGui.QStandardItemModel.removeRows(self.model(), index.row(), 1)
 
     def selectItem(self, item):
         index = self.model().indexFromItem(item)
         self.selectionModel().select(index, QtCore.QItemSelectionModel.Select)
 
+    def selectItems(self, items):
+        selection = QtCore.QItemSelection()
+        for item in items:
+            index = self.model().indexFromItem(item)
+            selection.select(index, index)
+        self.selectionModel().select(
+            selection, QtCore.QItemSelectionModel.Select
+        )
+
     def findItemByShape(self, shape):
-        for row in range(self.model().rowCount()):
-            item = self.model().item(row, 0)
-            if item.shape() == shape:
-                return item
+        return self.model().findItemByShape(shape)
 
     def clear(self):
         self.model().clear()
@@ -7,18 +7,50 @@ from .escapable_qlist_widget import EscapableQListWidget
 
 
 class UniqueLabelQListWidget(EscapableQListWidget):
+    def __init__(self, *args, **kwargs):
+        super(UniqueLabelQListWidget, self).__init__(*args, **kwargs)
+        self._labelToItems = {}
+
     def mousePressEvent(self, event):
         super(UniqueLabelQListWidget, self).mousePressEvent(event)
         if not self.indexAt(event.pos()).isValid():
             self.clearSelection()
 
+    def _indexItem(self, item):
+        label = item.data(Qt.UserRole)
+        self._labelToItems.setdefault(label, []).append(item)
+
+    def _unindexItem(self, item):
+        label = item.data(Qt.UserRole)
+        items = self._labelToItems.get(label, [])
+        if item in items:
+            items.remove(item)
+            if not items:
+                del self._labelToItems[label]
+
+    def addItem(self, item):
+        super(UniqueLabelQListWidget, self).addItem(item)
+        if isinstance(item, QtWidgets.QListWidgetItem):
+            self._indexItem(item)
+
+    def insertItem(self, row, item):
+        super(UniqueLabelQListWidget, self).insertItem(row, item)
+        if isinstance(item, QtWidgets.QListWidgetItem):
+            self._indexItem(item)
+
+    def takeItem(self, row):
+        item = super(UniqueLabelQListWidget, self).takeItem(row)
+        if item is not None:
+            self._unindexItem(item)
+        return item
+
+    def clear(self):
+        super(UniqueLabelQListWidget, self).clear()
+        self._labelToItems = {}
+
     def findItemsByLabel(self, label):
-        items = []
-        for row in range(self.count()):
-            item = self.item(row)
-            if item.data(Qt.UserRole) == label:
-                items.append(item)
-        return items
+        items = self._labelToItems.get(label, [])
+        return sorted(items, key=self.row)
 
     def createItemFromLabel(self, label):
         item = QtWidgets.QListWidgetItem()
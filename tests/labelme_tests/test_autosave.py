@@ -0,0 +1,43 @@
+import json
+import os
+import os.path as osp
+import threading
+
+from labelme.autosave import AutoSaver
+
+
+def _save(saver, filename, label):
+    saver.save(
+        filename,
+        shapes=[dict(label=label, points=[[0, 0]], shape_type="point")],
+        imagePath="img.jpg",
+        imageHeight=10,
+        imageWidth=10,
+    )
+
+
+def test_AutoSaver(qtbot, tmpdir):
+    saver = AutoSaver()
+    filename = osp.join(str(tmpdir), "sub", "img.json")
+
+    saved = []
+    saver.saved.connect(saved.append)
+    # connected before saving, so that the signal cannot be missed
+    with qtbot.waitSignal(saver.saved) as blocker:
+        # queued while the worker is busy, so they are coalesced
+        busy = threading.Event()
+        saver._executor.submit(busy.wait)
+        for label in ["a", "b", "c"]:
+            _save(saver, filename, label)
+        busy.set()
+        saver.wait()
+    assert blocker.args[0].filename == filename
+    qtbot.wait(10)
+    assert len(saved) == 1
+
+    with open(filename) as f:
+        data = json.load(f)
+    assert data["shapes"][0]["label"] == "c"
+    assert os.listdir(osp.dirname(filename)) == ["img.json"]
+
+    saver.shutdown()
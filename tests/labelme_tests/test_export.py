@@ -0,0 +1,153 @@
+import filecmp
+import os
+import os.path as osp
+import shutil
+import sys
+
+from labelme.cli import export
+from labelme.label_file import LabelFile
+
+
+here = osp.dirname(osp.abspath(__file__))
+data_dir = osp.join(here, "data")
+labels_file = osp.join(
+    here, "../../examples/instance_segmentation/labels.txt"
+)
+
+
+def _export(monkeypatch, input_dir, output_dir, *args):
+    argv = [
+        "labelme_export",
+        input_dir,
+        output_dir,
+        "--labels",
+        labels_file,
+        "--noviz",
+    ] + list(args)
+    monkeypatch.setattr(sys, "argv", argv)
+    export.main()
+
+
+def _read_manifest(output_dir):
+    return export.read_manifest(
+        osp.join(output_dir, export.EXPORT_DIR, "manifest.jsonl")
+    )
+
+
+def test_export_voc_workers(monkeypatch, tmpdir):
+    input_dir = osp.join(data_dir, "annotated")
+    out1 = osp.join(str(tmpdir), "out1")
+    out2 = osp.join(str(tmpdir), "out2")
+    args = ["--format", "voc-instance"]
+    _export(monkeypatch, input_dir, out1, *(args + ["-j", "1"]))
+    _export(monkeypatch, input_dir, out2, *(args + ["-j", "2"]))
+
+    for out_dir in export.get_output_dirs("voc-instance", noviz=True):
+        cmp = filecmp.dircmp(osp.join(out1, out_dir), osp.join(out2, out_dir))
+        assert len(cmp.left_list) == 3
+        assert not cmp.left_only and not cmp.right_only
+        _, mismatch, errors = filecmp.cmpfiles(
+            cmp.left, cmp.right, cmp.common_files, shallow=False
+        )
+        assert not mismatch and not errors
+    assert _read_manifest(out1) == _read_manifest(out2)
+
+
+def test_export_resume(monkeypatch, tmpdir):
+    input_dir = osp.join(data_dir, "annotated")
+    out = osp.join(str(tmpdir), "out")
+    _export(monkeypatch, input_dir, out, "-j", "1")
+
+    manifest_file = osp.join(out, export.EXPORT_DIR, "manifest.jsonl")
+    with open(manifest_file) as f:
+        lines = f.readlines()
+    # interrupted while writing the second entry
+    with open(manifest_file, "w") as f:
+        f.write(lines[0] + lines[1][:10])
+
+    _export(monkeypatch, input_dir, out, "-j", "1", "--update")
+    assert list(_read_manifest(out)) == [
+        "2011_000003.json",
+        "2011_000006.json",
+        "2011_000025.json",
+    ]
+
+
+def test_export_update(monkeypatch, tmpdir):
+    input_dir = osp.join(str(tmpdir), "input")
+    shutil.copytree(osp.join(data_dir, "annotated"), input_dir)
+    out = osp.join(str(tmpdir), "out")
+    _export(monkeypatch, input_dir, out, "-j", "1")
+    manifest = _read_manifest(out)
+
+    os.remove(osp.join(input_dir, "2011_000003.json"))
+    with open(osp.join(input_dir, "2011_000006.json"), "a") as f:
+        f.write("\n")
+    os.utime(osp.join(input_dir, "2011_000025.json"), (0, 0))  # touch only
+    unchanged_file = osp.join(out, "SegmentationClassPNG/2011_000025.png")
+    os.utime(unchanged_file, (0, 0))
+    _export(monkeypatch, input_dir, out, "-j", "1", "--update")
+
+    assert not osp.exists(osp.join(out, "JPEGImages/2011_000003.jpg"))
+    updated = _read_manifest(out)
+    assert list(updated) == ["2011_000006.json", "2011_000025.json"]
+    assert updated["2011_000006.json"] != manifest["2011_000006.json"]
+    assert updated["2011_000025.json"]["sha1"] == (
+        manifest["2011_000025.json"]["sha1"]
+    )
+    assert updated["2011_000025.json"]["mtime"] == 0
+    assert os.stat(unchanged_file).st_mtime == 0
+
+
+def test_export_update_error(monkeypatch, tmpdir):
+    input_dir = osp.join(str(tmpdir), "input")
+    shutil.copytree(osp.join(data_dir, "annotated"), input_dir)
+    out = osp.join(str(tmpdir), "out")
+    _export(monkeypatch, input_dir, out, "-j", "1", "--update")
+
+    label_file = osp.join(input_dir, "2011_000006.json")
+    with open(label_file, "rb") as f:
+        data = f.read()
+    with open(label_file, "wb") as f:
+        f.write(data[: len(data) // 2])
+    _export(monkeypatch, input_dir, out, "-j", "1", "--update")
+
+    # the outputs of the broken file are not kept as if they were current
+    assert list(_read_manifest(out)) == [
+        "2011_000003.json",
+        "2011_000025.json",
+    ]
+    for out_dir in export.get_output_dirs("voc", noviz=True):
+        assert not any(
+            name.startswith("2011_000006.")
+            for name in os.listdir(osp.join(out, out_dir))
+        )
+
+    with open(label_file, "wb") as f:
+        f.write(data)
+    _export(monkeypatch, input_dir, out, "-j", "1", "--update")
+    assert "2011_000006.json" in _read_manifest(out)
+    assert osp.exists(osp.join(out, "JPEGImages/2011_000006.jpg"))
+
+
+def test_export_json_and_npz(monkeypatch, tmpdir):
+    input_dir = osp.join(str(tmpdir), "input")
+    shutil.copytree(osp.join(data_dir, "annotated"), input_dir)
+    label_file = LabelFile(osp.join(input_dir, "2011_000003.json"))
+    label_file.save(
+        osp.join(input_dir, "2011_000003.npz"),
+        label_file.shapes,
+        label_file.imagePath,
+        None,
+        None,
+        label_file.imageData,
+    )
+    out = osp.join(str(tmpdir), "out")
+    _export(monkeypatch, input_dir, out, "-j", "1")
+
+    # the page with both label files is exported once, from the .json
+    assert list(_read_manifest(out)) == [
+        "2011_000003.json",
+        "2011_000006.json",
+        "2011_000025.json",
+    ]
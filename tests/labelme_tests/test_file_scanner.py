@@ -0,0 +1,50 @@
+import os
+import os.path as osp
+
+from labelme.file_scanner import get_labeled_files
+from labelme.file_scanner import iter_image_files
+
+
+def _touch(filename):
+    if not osp.exists(osp.dirname(filename)):
+        os.makedirs(osp.dirname(filename))
+    open(filename, "w").close()
+
+
+def test_iter_image_files(tmpdir):
+    root = str(tmpdir)
+    for filename in [
+        "b.jpg",
+        "B/c.PNG",
+        "a/x.jpg",
+        "a/x.json",
+        "a.b/y.jpg",
+        "a.b/notes.txt",
+        "ab.jpg",
+        "ab.json",
+        "c.jpg",
+        "c.npz",
+    ]:
+        _touch(osp.join(root, filename))
+
+    extensions = [".jpg", ".png"]
+    expected = []
+    for dirpath, _, files in os.walk(root):
+        for file in files:
+            if file.lower().endswith(tuple(extensions)):
+                expected.append(osp.join(dirpath, file))
+    expected.sort(key=lambda x: x.lower())
+
+    images = list(iter_image_files(root, extensions))
+    assert [filename for filename, _ in images] == expected
+    labeled = [osp.relpath(f, root) for f, is_labeled in images if is_labeled]
+    assert labeled == ["a/x.jpg", "ab.jpg", "c.jpg"]
+
+    filenames = [filename for filename, _ in images]
+    assert get_labeled_files(filenames) == set(
+        osp.join(root, f) for f in labeled
+    )
+    _touch(osp.join(root, "out/b.json"))
+    assert get_labeled_files(filenames, osp.join(root, "out")) == set(
+        [osp.join(root, "b.jpg")]
+    )
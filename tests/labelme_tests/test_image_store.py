@@ -0,0 +1,94 @@
+import json
+import os.path as osp
+import shutil
+
+from labelme.cli.image_store import embed_image
+from labelme.cli.image_store import extract_image
+from labelme.cli.image_store import iter_label_files
+from labelme.label_file import LabelFile
+
+
+here = osp.dirname(osp.abspath(__file__))
+data_dir = osp.join(here, "data")
+
+
+def test_LabelFile_imageStore(tmpdir):
+    img_file = osp.join(data_dir, "raw/2011_000003.jpg")
+    imageData = LabelFile.load_image_file(img_file)
+    filename = osp.join(str(tmpdir), "2011_000003.json")
+
+    LabelFile().save(
+        filename=filename,
+        shapes=[],
+        imagePath="2011_000003.jpg",
+        imageHeight=None,
+        imageWidth=None,
+        imageData=imageData,
+        imageStore="store",
+    )
+    with open(filename) as f:
+        data = json.load(f)
+    assert data["imageData"] is None
+    assert data["imageRef"].startswith("store")
+
+    label_file = LabelFile(filename)
+    assert label_file.imageData == imageData
+    assert label_file.imageStore == "store"
+    assert "imageRef" not in label_file.otherData
+
+
+def test_extract_embed_image(tmpdir):
+    json_file = osp.join(data_dir, "annotated_with_data/apc2016_obj3.json")
+    filename = osp.join(str(tmpdir), "apc2016_obj3.json")
+    shutil.copy(json_file, filename)
+    imageData = LabelFile(filename).imageData
+
+    assert extract_image(filename, ".labelme_images")
+    assert not extract_image(filename, ".labelme_images")
+    assert LabelFile(filename).imageData == imageData
+
+    assert embed_image(filename)
+    assert not embed_image(filename)
+    with open(json_file, "rb") as f1, open(filename, "rb") as f2:
+        assert f1.read() == f2.read()
+
+
+def test_extract_embed_image_npz(tmpdir):
+    json_file = osp.join(data_dir, "annotated_with_data/apc2016_obj3.json")
+    label_file = LabelFile(json_file)
+    filename = osp.join(str(tmpdir), "apc2016_obj3.npz")
+    label_file.save(
+        filename,
+        [
+            dict(
+                label=s["label"],
+                points=s["points"],
+                shape_type=s["shape_type"],
+                flags=s["flags"],
+                group_id=s["group_id"],
+            )
+            for s in label_file.shapes
+        ],
+        label_file.imagePath,
+        None,
+        None,
+        label_file.imageData,
+    )
+    # the .json of the same image is used instead, like in the app
+    shutil.copy(json_file, str(tmpdir))
+    assert list(iter_label_files([str(tmpdir)])) == [
+        osp.join(str(tmpdir), "apc2016_obj3.json")
+    ]
+
+    assert extract_image(filename, ".labelme_images")
+    assert not extract_image(filename, ".labelme_images")
+    extracted = LabelFile(filename)
+    assert extracted.imageData == label_file.imageData
+    assert extracted.imageStore == ".labelme_images"
+
+    assert embed_image(filename)
+    assert not embed_image(filename)
+    embedded = LabelFile(filename)
+    assert embedded.imageData == label_file.imageData
+    assert embedded.imageStore is None
+    assert embedded.shapes == extracted.shapes
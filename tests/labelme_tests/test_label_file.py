@@ -0,0 +1,111 @@
+import io
+import os.path as osp
+
+import PIL.Image
+
+from labelme.label_file import LabelFile
+from labelme import utils
+
+
+here = osp.dirname(osp.abspath(__file__))
+data_dir = osp.join(here, "data")
+
+
+def test_load_image_file_passthrough():
+    img_file = osp.join(data_dir, "raw/2011_000003.jpg")
+    with open(img_file, "rb") as f:
+        expected = f.read()
+    assert LabelFile.load_image_file(img_file) == expected
+
+
+def test_load_image_file_exif_orientation(tmpdir):
+    img = PIL.Image.new("RGB", (40, 20))
+    exif = img.getexif()
+    exif[0x0112] = 6  # Orientation: rotate 270
+    img_file = osp.join(str(tmpdir), "rotated.jpg")
+    img.save(img_file, exif=exif)
+
+    image_data = LabelFile.load_image_file(img_file)
+    img_loaded = PIL.Image.open(io.BytesIO(image_data))
+    assert img_loaded.size == (20, 40)
+
+
+def test_check_image_height_and_width():
+    img_file = osp.join(data_dir, "raw/2011_000003.jpg")
+    with open(img_file, "rb") as f:
+        image_data = f.read()
+    width, height = PIL.Image.open(img_file).size
+
+    assert LabelFile._check_image_height_and_width(
+        image_data, height, width
+    ) == (height, width)
+    assert LabelFile._check_image_height_and_width(
+        image_data, height + 1, width + 1
+    ) == (height, width)
+
+
+def test_save_load_npz(tmpdir):
+    json_file = osp.join(data_dir, "annotated_with_data/apc2016_obj3.json")
+    label_file = LabelFile(json_file)
+    shapes = [
+        dict(
+            label=s["label"],
+            points=s["points"],
+            shape_type=s["shape_type"],
+            flags=s["flags"],
+            group_id=s["group_id"],
+        )
+        for s in label_file.shapes
+    ]
+    shapes.append(
+        dict(label="empty", points=[], shape_type="point", flags={})
+    )
+
+    npz_file = osp.join(str(tmpdir), "apc2016_obj3.npz")
+    assert LabelFile.is_label_file(npz_file)
+    LabelFile().save(
+        filename=npz_file,
+        shapes=shapes,
+        imagePath=label_file.imagePath,
+        imageHeight=None,
+        imageWidth=None,
+        imageData=label_file.imageData,
+        flags={"a": True},
+    )
+
+    label_file_npz = LabelFile(npz_file)
+    assert label_file_npz.imageData == label_file.imageData
+    assert label_file_npz.imagePath == label_file.imagePath
+    assert label_file_npz.flags == {"a": True}
+    assert label_file_npz.shapes[:-1] == label_file.shapes
+    assert label_file_npz.shapes[-1]["points"] == []
+    assert label_file_npz.shapes[-1]["group_id"] is None
+
+
+def test_save_json_backends(tmpdir):
+    json_file = osp.join(data_dir, "annotated_with_data/apc2016_obj3.json")
+    label_file = LabelFile(json_file)
+    shapes = [
+        dict(
+            label=s["label"],
+            points=s["points"],
+            shape_type=s["shape_type"],
+            flags=s["flags"],
+            group_id=s["group_id"],
+        )
+        for s in label_file.shapes
+    ]
+    for backend in utils.JSON_BACKENDS:
+        filename = osp.join(str(tmpdir), backend + ".json")
+        LabelFile().save(
+            filename=filename,
+            shapes=shapes,
+            imagePath=label_file.imagePath,
+            imageHeight=None,
+            imageWidth=None,
+            imageData=label_file.imageData,
+            jsonBackend=backend,
+        )
+        saved = LabelFile(filename)
+        assert saved.shapes == label_file.shapes
+        assert saved.imageData == label_file.imageData
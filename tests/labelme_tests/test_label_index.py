@@ -0,0 +1,120 @@
+import collections
+import glob
+import json
+import os
+import os.path as osp
+import shutil
+
+from labelme.label_file import LabelFile
+from labelme import label_index
+from labelme.label_index import get_bbox
+from labelme.label_index import LabelIndex
+
+
+here = osp.dirname(osp.abspath(__file__))
+data_dir = osp.join(here, "data")
+
+
+def _count_labels(root_dir):
+    num_shapes = collections.Counter()
+    num_files = collections.Counter()
+    for filename in glob.glob(osp.join(root_dir, "*.json")):
+        with open(filename) as f:
+            labels = [s["label"] for s in json.load(f)["shapes"]]
+        num_shapes.update(labels)
+        num_files.update(set(labels))
+    return sorted(
+        (label, num_shapes[label], num_files[label]) for label in num_shapes
+    )
+
+
+def test_LabelIndex(tmpdir):
+    root_dir = osp.join(str(tmpdir), "annotated")
+    shutil.copytree(osp.join(data_dir, "annotated"), root_dir)
+    label_files = sorted(glob.glob(osp.join(root_dir, "*.json")))
+
+    with LabelIndex(root_dir) as index:
+        assert index.update() == (len(label_files), 0)
+        assert index.update() == (0, 0)
+        assert index.count_labels() == _count_labels(root_dir)
+
+        label = index.count_labels()[0][0]
+        files = [
+            f
+            for f in label_files
+            if label in [s["label"] for s in json.load(open(f))["shapes"]]
+        ]
+        assert index.find_files(label) == files
+
+        # changed and deleted files
+        with open(label_files[0]) as f:
+            data = json.load(f)
+        data["shapes"] = data["shapes"][:1]
+        with open(label_files[0], "w") as f:
+            json.dump(data, f)
+        os.remove(label_files[1])
+        assert index.update() == (1, 1)
+        assert index.count_labels() == _count_labels(root_dir)
+
+
+def test_get_bbox():
+    assert get_bbox([[1, 5], [3, 2], [2, 4]], "polygon") == (1, 2, 3, 5)
+    assert get_bbox([[10, 10], [13, 14]], "circle") == (5, 5, 15, 15)
+    assert get_bbox([], "point") == (None, None, None, None)
+
+
+def test_LabelIndex_not_label_file(monkeypatch, tmpdir):
+    root_dir = osp.join(str(tmpdir), "annotated")
+    shutil.copytree(osp.join(data_dir, "annotated"), root_dir)
+    num_label_files = len(glob.glob(osp.join(root_dir, "*.json")))
+    # e.g. written by labelme_export or labelme2coco
+    ann_file = osp.join(root_dir, "annotations.json")
+    with open(ann_file, "w") as f:
+        json.dump(dict(images=[], annotations=[], categories=[]), f)
+
+    read_files = []
+    orig_read_label_file = label_index.read_label_file
+
+    def read_label_file(filename):
+        read_files.append(osp.basename(filename))
+        return orig_read_label_file(filename)
+
+    monkeypatch.setattr(label_index, "read_label_file", read_label_file)
+    with LabelIndex(root_dir) as index:
+        assert index.update() == (num_label_files, 0)
+        assert "annotations.json" in read_files
+        num_files = index.connection.execute(
+            "SELECT COUNT(*) FROM files"
+        ).fetchone()[0]
+        assert num_files == num_label_files
+
+        # not read again until it changes
+        del read_files[:]
+        assert index.update() == (0, 0)
+        assert read_files == []
+        with open(ann_file, "a") as f:
+            f.write("\n")
+        assert index.update() == (0, 0)
+        assert read_files == ["annotations.json"]
+
+
+def test_LabelIndex_json_and_npz(tmpdir):
+    root_dir = osp.join(str(tmpdir), "annotated")
+    shutil.copytree(osp.join(data_dir, "annotated"), root_dir)
+    expected = _count_labels(root_dir)
+    label_file = LabelFile(osp.join(root_dir, "2011_000003.json"))
+    label_file.save(
+        osp.join(root_dir, "2011_000003.npz"),
+        label_file.shapes,
+        label_file.imagePath,
+        None,
+        None,
+    )
+
+    with LabelIndex(root_dir) as index:
+        index.update()
+        # the page is counted once, from the .json like in the app
+        assert index.count_labels() == expected
+        assert not any(
+            f.endswith(".npz") for f in index.find_files(expected[0][0])
+        )
@@ -0,0 +1,94 @@
+import os
+import os.path as osp
+
+from qtpy import QtCore
+from qtpy import QtGui
+
+from labelme.pyramid import ImagePyramid
+from labelme.pyramid import prune_cache_dir
+
+
+def test_prune_cache_dir(tmpdir):
+    cache_dir = str(tmpdir)
+    for i, key in enumerate(["a", "b", "c", "d"]):
+        os.makedirs(osp.join(cache_dir, key))
+        with open(osp.join(cache_dir, key, "1_0_0.png"), "wb") as f:
+            f.write(b"\0" * 100)
+        os.utime(osp.join(cache_dir, key), (i, i))  # a is the oldest
+
+    prune_cache_dir(cache_dir, max_bytes=250, keep="a")
+    assert sorted(os.listdir(cache_dir)) == ["a", "d"]
+
+    prune_cache_dir(cache_dir, max_bytes=1000)
+    assert sorted(os.listdir(cache_dir)) == ["a", "d"]
+
+
+def _make_image(width, height):
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_RGB32)
+    image.fill(QtGui.QColor(255, 0, 0))
+    return image
+
+
+def test_ImagePyramid_levelForScale(qtbot):
+    pyramid = ImagePyramid(_make_image(4096, 2048), tile_size=512)
+    assert pyramid.max_level == 3
+    assert pyramid.levelForScale(1) == 0
+    assert pyramid.levelForScale(0.5) == 0
+    assert pyramid.levelForScale(0.3) == 1
+    assert pyramid.levelForScale(0.25) == 2
+    assert pyramid.levelForScale(0.01) == 3
+    pyramid.close()
+
+
+def test_ImagePyramid_loadTile(qtbot, tmpdir):
+    cache_dir = str(tmpdir)
+    pyramid = ImagePyramid(
+        _make_image(1000, 600), tile_size=128, cache_dir=cache_dir
+    )
+    image = pyramid._loadTile((1, 0, 0))
+    assert image.size() == QtCore.QSize(128, 128)
+    assert image.pixelColor(10, 10) == QtGui.QColor(255, 0, 0)
+    # the last column and row are cut off by the image
+    assert pyramid._loadTile((1, 3, 2)).size() == QtCore.QSize(116, 44)
+
+    # tiles are loaded from the disk cache of the same image
+    cache_file = osp.join(cache_dir, pyramid._getKey(), "1_0_0.png")
+    assert osp.exists(cache_file)
+    cached = QtGui.QImage(128, 128, QtGui.QImage.Format_RGB32)
+    cached.fill(QtGui.QColor(0, 0, 255))
+    assert cached.save(cache_file)
+    pyramid.close()
+
+    pyramid = ImagePyramid(
+        _make_image(1000, 600), tile_size=128, cache_dir=cache_dir
+    )
+    image = pyramid._loadTile((1, 0, 0))
+    assert image.pixelColor(10, 10) == QtGui.QColor(0, 0, 255)
+    pyramid.close()
+
+
+def test_ImagePyramid_draw(qtbot):
+    pyramid = ImagePyramid(_make_image(1000, 600), tile_size=128)
+    target = QtGui.QImage(1000, 600, QtGui.QImage.Format_RGB32)
+    painter = QtGui.QPainter(target)
+    rect = QtCore.QRect(0, 0, 1000, 600)
+
+    assert not pyramid.draw(painter, rect, scale=1)
+    assert not pyramid._futures
+
+    # zoomed out, the tiles of level 2 cover the image
+    with qtbot.waitSignals([pyramid.tileReady] * 4):
+        assert pyramid.draw(painter, rect, scale=0.25)
+    assert pyramid.draw(painter, rect, scale=0.25)
+    assert sorted(pyramid._pixmaps) == [
+        (2, 0, 0),
+        (2, 0, 1),
+        (2, 1, 0),
+        (2, 1, 1),
+    ]
+    # until its own tiles are built, level 1 is drawn from level 2
+    assert pyramid._drawCoarser(painter, QtCore.QRect(256, 0, 256, 256), 1)
+    assert not pyramid._drawCoarser(painter, rect, 2)
+    painter.end()
+    assert target.pixelColor(500, 300) == QtGui.QColor(255, 0, 0)
+    pyramid.close()
@@ -0,0 +1,83 @@
+from qtpy import QtCore
+
+from labelme.shape import Shape
+from labelme.shape_history import ShapeHistory
+
+
+def _make_shape(x, y):
+    shape = Shape(label="a", shape_type="rectangle")
+    shape.addPoint(QtCore.QPointF(x, y))
+    shape.addPoint(QtCore.QPointF(x + 10, y + 10))
+    shape.close()
+    return shape
+
+
+def test_shape_history():
+    a = _make_shape(0, 0)
+    b = _make_shape(20, 20)
+    shapes = [a]
+    history = ShapeHistory(limit=10)
+    history.reset(shapes)
+    assert not history.canUndo()
+
+    # add a shape
+    shapes.append(b)
+    history.touch([b])
+    history.touchOrder()
+    assert history.commit(shapes)
+
+    # move a shape
+    a.moveBy(QtCore.QPointF(5, 5))
+    history.touch([a])
+    assert history.commit(shapes)
+    assert not history.commit(shapes)  # nothing changed
+
+    order, changed = history.undo()
+    assert order is None
+    assert changed == [a]
+    assert a[0] == QtCore.QPointF(0, 0)
+
+    order, changed = history.undo()
+    assert order == [a]
+    assert history.canRedo()
+
+    order, changed = history.redo()
+    assert order == [a, b]
+    order, changed = history.redo()
+    assert a[0] == QtCore.QPointF(5, 5)
+    assert not history.canRedo()
+
+
+def test_shape_history_discard():
+    a = _make_shape(0, 0)
+    shapes = []
+    history = ShapeHistory()
+    history.reset(shapes)
+
+    shapes.append(a)
+    history.touch([a])
+    history.touchOrder()
+    history.commit(shapes)
+
+    a.label = "b"
+    history.discard()
+    assert not history.canUndo()
+    assert history.commit(shapes)
+
+    history.undo()
+    assert history.redo() == ([a], [a])
+    assert a.label == "b"
+
+
+def test_shape_history_limit():
+    a = _make_shape(0, 0)
+    history = ShapeHistory(limit=3)
+    history.reset([a])
+    for _ in range(5):
+        a.moveBy(QtCore.QPointF(1, 0))
+        history.touch([a])
+        history.commit([a])
+    for _ in range(3):
+        history.undo()
+    assert not history.canUndo()
+    assert a[0] == QtCore.QPointF(2, 0)
@@ -0,0 +1,22 @@
+from labelme.spatial_index import GridIndex
+
+
+def test_grid_index():
+    index = GridIndex(cell_size=10)
+    index.insert("a", (0, 0, 5, 5))
+    index.insert("b", (3, 3, 25, 25))
+    index.insert("c", (100, 100, 110, 110))
+    assert len(index) == 3
+    assert index.queryPoint(4, 4) == ["a", "b"]
+    assert index.queryPoint(20, 20) == ["b"]
+    assert index.queryPoint(50, 50) == []
+    assert index.queryPoint(98, 98, radius=2) == ["c"]
+
+    # moving keeps the insertion order
+    index.insert("a", (20, 20, 22, 22))
+    assert index.queryPoint(21, 21) == ["a", "b"]
+    assert index.queryPoint(1, 1) == []
+
+    index.remove("b")
+    assert "b" not in index
+    assert index.queryPoint(21, 21) == ["a"]
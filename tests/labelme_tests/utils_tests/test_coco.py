@@ -0,0 +1,61 @@
+import json
+import os.path as osp
+
+from labelme.utils import coco as coco_module
+
+
+def _get_data(num_images, num_annotations):
+    return dict(
+        info=dict(description=None, year=2020, date_created="now"),
+        licenses=[dict(url=None, id=0, name=None)],
+        images=[
+            dict(id=i, file_name=u"JPEGImages/画像{}.jpg".format(i))
+            for i in range(num_images)
+        ],
+        type="instances",
+        annotations=[
+            dict(id=i, image_id=0, bbox=[0.5, 1.0, 2.25, 3.0], area=1e-7)
+            for i in range(num_annotations)
+        ],
+        categories=[dict(supercategory=None, id=0, name="_background_")],
+    )
+
+
+def test_coco_writer(tmpdir):
+    for num_images, num_annotations in [(0, 0), (1, 1), (3, 10)]:
+        data = _get_data(num_images, num_annotations)
+        expected_file = osp.join(str(tmpdir), "expected.json")
+        with open(expected_file, "w") as f:
+            json.dump(data, f)
+
+        out_file = osp.join(str(tmpdir), "annotations.json")
+        with coco_module.CocoWriter(
+            out_file,
+            info=data["info"],
+            licenses=data["licenses"],
+            type=data["type"],
+        ) as writer:
+            for category in data["categories"]:
+                writer.add_category(category)
+            for image in data["images"]:
+                writer.add_image(image)
+            for annotation in data["annotations"]:
+                writer.add_annotation(annotation)
+        assert writer.num_images == num_images
+        assert writer.num_annotations == num_annotations
+
+        with open(expected_file, "rb") as f:
+            expected = f.read()
+        with open(out_file, "rb") as f:
+            assert f.read() == expected
+
+
+def test_coco_writer_error(tmpdir):
+    out_file = osp.join(str(tmpdir), "annotations.json")
+    try:
+        with coco_module.CocoWriter(out_file) as writer:
+            writer.add_image(dict(id=0))
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert not osp.exists(out_file)
@@ -0,0 +1,54 @@
+import json
+import os.path as osp
+
+import numpy as np
+
+from labelme.utils import _json as json_module
+
+
+here = osp.dirname(osp.abspath(__file__))
+data_dir = osp.join(here, "../data")
+
+
+def test_json_dumps():
+    data = dict(
+        shapes=[dict(label=u"ラベル", points=[(1.5, 2.0), [3, 4]])],
+        imageData=None,
+        flags={},
+    )
+    expected = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    for backend in json_module.JSON_BACKENDS:
+        assert json_module.json_dumps(data, backend=backend) == expected
+        compact = json_module.json_dumps(data, compact=True, backend=backend)
+        assert b" " not in compact
+        assert json_module.json_loads(compact, backend=backend) == (
+            json.loads(expected)
+        )
+
+    value = json_module.json_dumps([np.float64(0.5)], compact=True)
+    assert value == b"[0.5]"
+
+
+def test_json_dumps_floats():
+    data = [1e-07, 1e16, 0.1, float("nan"), float("inf")]
+    expected = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    assert json_module.json_dumps(data) == expected
+    assert json_module.json_dumps(data, compact=True) == json.dumps(
+        data, separators=(",", ":")
+    ).encode("utf-8")
+
+    for backend in json_module.JSON_BACKENDS:
+        loaded = json_module.json_loads(expected, backend=backend)
+        assert loaded[:3] == data[:3]
+        assert np.isnan(loaded[3]) and loaded[4] == float("inf")
+
+
+def test_json_round_trip():
+    label_file = osp.join(data_dir, "annotated_with_data/apc2016_obj3.json")
+    data = json_module.json_load(label_file, backend="json")
+    for backend in json_module.JSON_BACKENDS:
+        for compact in [False, True]:
+            text = json_module.json_dumps(
+                data, compact=compact, backend=backend
+            )
+            assert json_module.json_loads(text) == data
@@ -0,0 +1,21 @@
+import numpy as np
+from qtpy.QtCore import QPointF
+
+from labelme.utils import label as label_module
+
+
+def test_connected_component_from_rectangle_region():
+    np_image = np.full((100, 200), 255, dtype=np.uint8)
+    np_image[30:35, 40:50] = 0  # inside of the rectangle
+    np_image[20:40, 60:80] = 0  # crossing the border of the rectangle
+    np_image[80:90, 150:160] = 0  # outside of the rectangle
+
+    rectangle = [QPointF(70, 25), QPointF(20, 60)]
+    cc_region = label_module.connected_component_from_rectangle_region(
+        np_image, rectangle
+    )
+    assert len(cc_region) == 1
+    shape, area = cc_region[0]
+    assert area == 50
+    assert (shape[0].x(), shape[0].y()) == (40, 30)
+    assert (shape[1].x(), shape[1].y()) == (50, 35)
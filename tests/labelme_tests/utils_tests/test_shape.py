@@ -1,3 +1,9 @@
+import math
+
+import numpy as np
+import PIL.Image
+import PIL.ImageDraw
+
 from .util import get_img_and_data
 
 from labelme.utils import shape as shape_module
@@ -22,3 +28,127 @@ def test_shape_to_mask():
         points = shape["points"]
         mask = shape_module.shape_to_mask(img.shape[:2], points)
         assert mask.shape == img.shape[:2]
+
+
+def _full_frame_mask(img_shape, points, shape_type, line_width, point_size):
+    # shape_to_mask as it was before it used shape_to_bbox_mask
+    mask = PIL.Image.fromarray(np.zeros(img_shape[:2], dtype=np.uint8))
+    draw = PIL.ImageDraw.Draw(mask)
+    xy = [tuple(point) for point in points]
+    if shape_type == "circle":
+        (cx, cy), (px, py) = xy
+        d = math.sqrt((cx - px) ** 2 + (cy - py) ** 2)
+        draw.ellipse([cx - d, cy - d, cx + d, cy + d], outline=1, fill=1)
+    elif shape_type == "rectangle":
+        draw.rectangle(xy, outline=1, fill=1)
+    elif shape_type in ["line", "linestrip"]:
+        draw.line(xy=xy, fill=1, width=line_width)
+    elif shape_type == "point":
+        cx, cy = xy[0]
+        r = point_size
+        draw.ellipse([cx - r, cy - r, cx + r, cy + r], outline=1, fill=1)
+    else:
+        draw.polygon(xy=xy, outline=1, fill=1)
+    return np.array(mask, dtype=bool)
+
+
+def _iter_random_shapes(img_shape, num_shapes):
+    num_points = dict(
+        polygon=6, rectangle=2, circle=2, line=2, linestrip=4, point=1
+    )
+    random_state = np.random.RandomState(0)
+    height, width = img_shape
+    for _ in range(num_shapes):
+        for shape_type, n in num_points.items():
+            # partly outside of the image, too
+            points = random_state.uniform(-0.1, 1.1, (n, 2)) * [width, height]
+            if shape_type == "rectangle":
+                points = np.sort(points, axis=0)
+            if shape_type == "polygon":
+                shape_type = None
+            line_width = random_state.randint(1, 20)
+            point_size = random_state.uniform(0, 10)
+            yield points.tolist(), shape_type, line_width, point_size
+
+
+def test_shape_to_bbox_mask():
+    img_shape = (480, 640)
+    # drawn 1px off when the shapes were shifted to the bounding box
+    shapes = [
+        (
+            [
+                [617.2969927005076, 23.805053212716842],
+                [61.15751551580587, 75.46651525145718],
+                [373.7784573723099, 315.0780583571601],
+                [390.529977056595, 436.9521670502031],
+                [609.0670834739961, 333.23361540021926],
+                [299.9369659128398, 310.36294807155286],
+            ],
+            None,
+            10,
+            5,
+        ),
+        (
+            [
+                [515.5278861866045, 55.846622032410025],
+                [445.88592968737316, 479.3029582098423],
+            ],
+            "line",
+            11,
+            5,
+        ),
+        (
+            [
+                [192.28424881670108, 350.54935131853875],
+                [652.6568077334883, 438.0950108859206],
+                [315.4684883637787, 38.971426829925704],
+                [432.39953430592976, 83.46336465392811],
+            ],
+            "linestrip",
+            2,
+            5,
+        ),
+    ]
+    shapes += list(_iter_random_shapes(img_shape, 30))
+    for points, shape_type, line_width, point_size in shapes:
+        expected = _full_frame_mask(
+            img_shape, points, shape_type, line_width, point_size
+        )
+        bbox_mask, (y1, x1, y2, x2) = shape_module.shape_to_bbox_mask(
+            img_shape,
+            points,
+            shape_type=shape_type,
+            line_width=line_width,
+            point_size=point_size,
+        )
+        assert bbox_mask.shape == (y2 - y1, x2 - x1)
+        assert (expected[y1:y2, x1:x2] == bbox_mask).all()
+        assert expected.sum() == bbox_mask.sum()
+        mask = shape_module.shape_to_mask(
+            img_shape,
+            points,
+            shape_type=shape_type,
+            line_width=line_width,
+            point_size=point_size,
+        )
+        assert (mask == expected).all()
+
+
+def test_shapes_to_label_deterministic():
+    img, data = get_img_and_data()
+    label_name_to_value = {"_background_": 0}
+    for shape in data["shapes"]:
+        label_name = shape["label"]
+        label_value = len(label_name_to_value)
+        label_name_to_value.setdefault(label_name, label_value)
+    shapes = [dict(shape, group_id=None) for shape in data["shapes"]]
+    cls1, ins1 = shape_module.shapes_to_label(
+        img.shape, shapes, label_name_to_value
+    )
+    cls2, ins2 = shape_module.shapes_to_label(
+        img.shape, shapes, label_name_to_value
+    )
+    assert (cls1 == cls2).all()
+    assert (ins1 == ins2).all()
+    # each ungrouped shape is an instance of its own
+    assert ins1.max() == len(shapes)
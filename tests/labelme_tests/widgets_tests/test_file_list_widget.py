@@ -0,0 +1,36 @@
+from qtpy import QtCore
+
+from labelme.widgets import FileListWidget
+
+
+def test_FileListWidget(qtbot):
+    widget = FileListWidget()
+    qtbot.addWidget(widget)
+
+    widget.addFiles(["a/1.jpg", "a/2.jpg"], [True, False])
+    widget.addFiles(["b/1.jpg"], [False])
+    assert widget.count() == 3
+    assert widget.row("a/2.jpg") == 1
+    assert widget.row("b/1.jpg") == 2
+    assert widget.row("c/1.jpg") == -1
+    assert widget.filename(2) == "b/1.jpg"
+
+    model = widget.model()
+    index = model.index(0)
+    assert model.data(index, QtCore.Qt.CheckStateRole) == QtCore.Qt.Checked
+    widget.setLabeled("a/1.jpg", False)
+    assert model.data(index, QtCore.Qt.CheckStateRole) == QtCore.Qt.Unchecked
+
+    widget.setPattern("1.jpg")
+    assert widget.filenames() == ["a/1.jpg", "b/1.jpg"]
+    assert widget.row("b/1.jpg") == 1
+    assert widget.row("a/2.jpg") == -1
+    assert "a/2.jpg" in model
+
+    widget.setCurrentRow(1)
+    assert widget.currentRow() == 1
+    assert widget.selectedFilenames() == ["b/1.jpg"]
+
+    widget.clear()
+    assert widget.count() == 0
+    assert widget.row("a/1.jpg") == -1
@@ -1,5 +1,6 @@
 # -*- encoding: utf-8 -*-
 
+from labelme.shape import Shape
 from labelme.widgets import LabelListWidget
 from labelme.widgets import LabelListWidgetItem
 
@@ -15,3 +16,32 @@ def test_LabelListWidget(qtbot):
     widget.show()
     qtbot.addWidget(widget)
     qtbot.waitForWindowShown(widget)
+
+
+def test_LabelListWidget_findItemByShape(qtbot):
+    widget = LabelListWidget()
+    qtbot.addWidget(widget)
+
+    shapes = [Shape(label=str(i)) for i in range(3)]
+    items = [LabelListWidgetItem(shape.label, shape) for shape in shapes]
+    for item in items:
+        widget.addItem(item)
+    assert widget.findItemByShape(shapes[1]) is items[1]
+
+    widget.removeItem(items[1])
+    assert widget.findItemByShape(shapes[1]) is None
+    assert widget.findItemByShape(shapes[2]) is items[2]
+
+    widget.clear()
+    assert widget.findItemByShape(shapes[0]) is None
+
+
+def test_LabelListWidget_addItems(qtbot):
+    widget = LabelListWidget()
+    qtbot.addWidget(widget)
+
+    shapes = [Shape(label=str(i)) for i in range(100)]
+    widget.addItems([LabelListWidgetItem(s.label, s) for s in shapes])
+    assert len(widget) == 100
+    assert [item.shape() for item in widget] == shapes
+    assert widget.findItemByShape(shapes[50]) is widget[50]